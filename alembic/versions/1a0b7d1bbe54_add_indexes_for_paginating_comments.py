@@ -0,0 +1,28 @@
+"""Add indexes for paginating comments
+
+Revision ID: 1a0b7d1bbe54
+Revises: 81b8cbd6f3a6
+Create Date: 2026-10-18 14:26:01.740780
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1a0b7d1bbe54'
+down_revision: Union[str, None] = '81b8cbd6f3a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comment_problem_id_created_at_id', 'comment', ['problem_id', 'created_at', 'id'])
+    op.create_index('ix_comment_problem_id_likes_id', 'comment', ['problem_id', 'likes', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comment_problem_id_likes_id', table_name='comment')
+    op.drop_index('ix_comment_problem_id_created_at_id', table_name='comment')
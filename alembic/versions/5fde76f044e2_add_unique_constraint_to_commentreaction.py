@@ -0,0 +1,43 @@
+"""Add unique constraint to CommentReaction
+
+Revision ID: 5fde76f044e2
+Revises: 80f372e374b6
+Create Date: 2026-10-18 14:18:52.274651
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5fde76f044e2'
+down_revision: Union[str, None] = '80f372e374b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The enum was recreated without this value in e72dd4907adf,
+    # so reactions to question responses could never be stored.
+    op.execute("ALTER TYPE reactionowner ADD VALUE IF NOT EXISTS 'QUESTION_RESPONSE'")
+    # Keep only the latest reaction of each user before enforcing uniqueness
+    op.execute(
+        'DELETE FROM comment_reaction older USING comment_reaction newer '
+        'WHERE older.user_id = newer.user_id '
+        'AND older.comment_id = newer.comment_id '
+        'AND older.belongs_to = newer.belongs_to '
+        'AND older.id < newer.id'
+    )
+    op.create_unique_constraint(
+        'uq_comment_reaction_user_comment_owner',
+        'comment_reaction',
+        ['user_id', 'comment_id', 'belongs_to']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'uq_comment_reaction_user_comment_owner', 'comment_reaction', type_='unique'
+    )
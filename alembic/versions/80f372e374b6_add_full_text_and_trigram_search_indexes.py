@@ -0,0 +1,62 @@
+"""Add full-text and trigram search indexes
+
+Revision ID: 80f372e374b6
+Revises: f15711fdacd3
+Create Date: 2026-10-18 14:15:14.546621
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80f372e374b6'
+down_revision: Union[str, None] = 'f15711fdacd3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS = (
+    ('problem', 'description'),
+    ('question', 'title'),
+    ('question', 'description'),
+)
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_problem_description_fts',
+        'problem',
+        [sa.text("to_tsvector('english'::regconfig, description)")],
+        postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_question_fts',
+        'question',
+        [sa.text("to_tsvector('english'::regconfig, title || ' ' || description)")],
+        postgresql_using='gin'
+    )
+
+    # pg_trgm ships with the contrib package, which some builds leave out.
+    # Substring search still works without it, just without an index.
+    has_trgm = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if has_trgm:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            )
+
+
+def downgrade() -> None:
+    for table, column in TRIGRAM_COLUMNS:
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}_trgm')
+    op.drop_index('ix_question_fts', table_name='question')
+    op.drop_index('ix_problem_description_fts', table_name='problem')
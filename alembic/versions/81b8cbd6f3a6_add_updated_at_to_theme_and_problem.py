@@ -0,0 +1,31 @@
+"""Add updated_at to Theme and Problem
+
+Revision ID: 81b8cbd6f3a6
+Revises: 5fde76f044e2
+Create Date: 2026-10-18 14:23:34.004790
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81b8cbd6f3a6'
+down_revision: Union[str, None] = '5fde76f044e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('theme', 'problem'):
+        op.add_column(
+            table,
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False)
+        )
+
+
+def downgrade() -> None:
+    for table in ('theme', 'problem'):
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,34 @@
+"""Add completions counter to Problem
+
+Revision ID: 9fe7b4e22f3c
+Revises: 890e5c7b4e69
+Create Date: 2026-10-18 14:13:27.196989
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fe7b4e22f3c'
+down_revision: Union[str, None] = '890e5c7b4e69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'problem',
+        sa.Column('completions', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.execute(
+        'UPDATE problem SET completions = ('
+        'SELECT count(*) FROM problem_user WHERE problem_user.problem_id = problem.id'
+        ')'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('problem', 'completions')
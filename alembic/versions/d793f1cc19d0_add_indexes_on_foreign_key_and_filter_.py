@@ -0,0 +1,52 @@
+"""Add indexes on foreign key and filter columns
+
+Built with CREATE INDEX CONCURRENTLY so writes keep going while they build.
+comment.problem_id, problem_user.problem_id and the comment_reaction lookup
+are already led by existing indexes and aren't repeated here.
+
+Revision ID: d793f1cc19d0
+Revises: 1a0b7d1bbe54
+Create Date: 2026-10-18 14:39:15.749136
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd793f1cc19d0'
+down_revision: Union[str, None] = '1a0b7d1bbe54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ('ix_problem_theme_id_id', 'problem', ['theme_id', 'id']),
+    ('ix_problem_author_id', 'problem', ['author_id']),
+    ('ix_question_theme_id_created_at_id', 'question', ['theme_id', 'created_at', 'id']),
+    ('ix_question_author_id', 'question', ['author_id']),
+    ('ix_question_response_question_id', 'question_response', ['question_id']),
+    ('ix_question_response_author_id', 'question_response', ['author_id']),
+    ('ix_comment_author_id', 'comment', ['author_id']),
+    ('ix_comment_response_comment_id', 'comment_response', ['comment_id']),
+    ('ix_comment_response_author_id', 'comment_response', ['author_id']),
+    ('ix_problem_user_user_id', 'problem_user', ['user_id']),
+    ('ix_explanation_image_problem_id', 'explanation_image', ['problem_id']),
+)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
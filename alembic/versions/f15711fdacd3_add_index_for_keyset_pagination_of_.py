@@ -0,0 +1,26 @@
+"""Add index for keyset pagination of questions
+
+Revision ID: f15711fdacd3
+Revises: 9fe7b4e22f3c
+Create Date: 2026-10-18 14:14:30.071926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f15711fdacd3'
+down_revision: Union[str, None] = '9fe7b4e22f3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_question_created_at_id', 'question', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_created_at_id', table_name='question')
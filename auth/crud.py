@@ -1,14 +1,19 @@
+import logging
+
+import jwt
 from fastapi import HTTPException, Form, Depends
 from fastapi.security import HTTPBearer
-from sqlalchemy import insert, select, column
+from sqlalchemy import insert, select, column, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only
 from starlette.requests import Request
 
 import dependencies
 from auth import schemas, models, utils
-from auth.utils import validate_password_registration, validate_password
+from auth.utils import validate_password_registration, validate_password_async
+
 
+logger = logging.getLogger(__name__)
 
 http_bearer = HTTPBearer()
 
@@ -49,52 +54,30 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> schemas.User:
     return user
 
 
-async def get_user_by_email(db: AsyncSession, email: str) -> None | schemas.User:
-    stmt = (
-        select(models.User)
-        .options(selectinload(models.User.completed_problems))
-        .options(selectinload(models.User.comment_responses))
-        .options(selectinload(models.User.comments))
-        .options(selectinload(models.User.questions))
-        .options(selectinload(models.User.created_problems))
-        .options(selectinload(models.User.question_responses))
-        .filter_by(email=email)
-    )
-    result = await db.execute(stmt)
-    return result.unique().scalar_one_or_none()
-
-
-async def get_user_by_username(db: AsyncSession, username: str) -> None | schemas.User:
-    stmt = (
-        select(models.User)
-        .options(selectinload(models.User.completed_problems))
-        .options(selectinload(models.User.comment_responses))
-        .options(selectinload(models.User.questions))
-        .options(selectinload(models.User.comments))
-        .options(selectinload(models.User.created_problems))
-        .options(selectinload(models.User.question_responses))
-        .filter_by(username=username)
-    )
-    result = await db.execute(stmt)
-    return result.unique().scalar_one_or_none()
-
-
 async def get_user_by_email_or_username(
         db: AsyncSession,
         email_or_username: str | None
-) -> schemas.UserFull | None:
-    email_user = await get_user_by_email(db=db, email=email_or_username)
-    username_user = await get_user_by_username(db=db, username=email_or_username)
-
-    if email_user and username_user:
-        if email_user.id == username_user.id:
-            return email_user
-
-    if email_user and not username_user:
-        return email_user
-
-    if username_user and not email_user:
-        return username_user
+) -> schemas.UserCredentials | None:
+    stmt = (
+        select(
+            models.User.id,
+            models.User.username,
+            models.User.email,
+            models.User.hash_password,
+        )
+        .where(
+            or_(
+                models.User.email == email_or_username,
+                models.User.username == email_or_username,
+            )
+        )
+        .limit(2)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+    if len(rows) != 1:
+        return None
+    return schemas.UserCredentials.model_validate(rows[0])
 
 
 async def delete_user_by_id(db: AsyncSession, user_id: int):
@@ -107,13 +90,22 @@ async def delete_user_by_id(db: AsyncSession, user_id: int):
 async def create_user(db: AsyncSession, user_schema: schemas.UserBase) -> schemas.UserRegisterResponse:
     validate_password_registration(password1=user_schema.password1, password2=user_schema.password2)
 
-    if await get_user_by_username(db, user_schema.username):
+    stmt = select(models.User.username, models.User.email).where(
+        or_(
+            models.User.username == user_schema.username,
+            models.User.email == user_schema.email,
+        )
+    )
+    result = await db.execute(stmt)
+    existing = result.all()
+
+    if any(user.username == user_schema.username for user in existing):
         raise HTTPException(400, f"User with username {user_schema.username} already exists")
 
-    if await get_user_by_email(db, user_schema.email):
+    if any(user.email == user_schema.email for user in existing):
         raise HTTPException(400, f"User with email {user_schema.email} already exists")
 
-    hash_password = utils.hash_password(user_schema.password1)
+    hash_password = await utils.hash_password_async(user_schema.password1)
     data = user_schema.model_dump(exclude={"password1", "password2"})
     data["hash_password"] = hash_password
     stmt = insert(models.User).values(**data).returning(
@@ -130,37 +122,66 @@ async def validate_auth_user(
         db: AsyncSession = Depends(dependencies.get_db),
         username_or_email: str = Form(),
         password: str = Form(),
-) -> schemas.User:
+) -> schemas.UserCredentials:
     auth_exc = HTTPException(400, "Invalid credentials")
     user = await get_user_by_email_or_username(db=db, email_or_username=username_or_email)
     if not user:
         raise auth_exc
-    if not validate_password(password, user.hash_password):
+    if not await validate_password_async(password, user.hash_password):
         raise auth_exc
 
     return user
 
 
+async def get_user_id_from_token(request: Request) -> int | None:
+    """The token's subject, or None for a missing, malformed or expired token."""
+    try:
+        credentials = await http_bearer(request)
+        data = utils.decode_jwt(token=credentials.credentials)
+    except (HTTPException, jwt.PyJWTError) as e:
+        logger.debug("anonymous request: %s", e)
+        return None
+    return data.get("sub")
+
+
+async def get_principal(db: AsyncSession, user_id: int) -> models.User | None:
+    """Loads only the columns permission checks need, without any relationships."""
+    stmt = (
+        select(models.User)
+        .options(
+            load_only(
+                models.User.id,
+                models.User.username,
+                models.User.email,
+                models.User.score,
+                models.User.is_superuser,
+            )
+        )
+        .filter_by(id=user_id)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(dependencies.get_db),
+) -> models.User | None:
+    user_id = await get_user_id_from_token(request)
+    if user_id is None:
+        return None
+    return await get_principal(db=db, user_id=user_id)
+
+
+async def get_current_user_full(
+    request: Request,
+    db: AsyncSession = Depends(dependencies.get_db),
 ) -> schemas.User | None:
+    """Same as get_current_user, but loads the whole User graph. Use only when needed."""
+    user_id = await get_user_id_from_token(request)
+    if user_id is None:
+        return None
     try:
-        credentials = await http_bearer(request)
-        token = credentials.credentials
-        data = utils.decode_jwt(token=token)
-        user = await get_user_by_id(user_id=data.get("sub"), db=db)
-        return user
-    except Exception as e:
-        print(str(e))
-
-
-async def increment_user_score(db: AsyncSession, user: models.User, problem_level: str):
-    if problem_level == "easy":
-        user.score += 5
-    elif problem_level == "medium":
-        user.score += 10
-    elif problem_level == "hard":
-        user.score += 20
-    await db.commit()
-    await db.refresh(user)
+        return await get_user_by_id(user_id=user_id, db=db)
+    except HTTPException:
+        return None
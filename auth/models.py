@@ -1,3 +1,6 @@
+import datetime
+
+from sqlalchemy import func
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from database import Base
@@ -10,6 +13,10 @@ class User(Base):
     username: Mapped[str] = mapped_column(unique=True)
     email: Mapped[str] = mapped_column(unique=True)
     score: Mapped[int] = mapped_column(default=0)
+    # moved with the score, so the leaderboard can reload only the changed ones
+    score_updated_at: Mapped[datetime.datetime] = mapped_column(
+        server_default=func.now(), index=True
+    )
     is_superuser: Mapped[bool] = mapped_column(default=False)
     hash_password: Mapped[bytes]
 
@@ -1,10 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth import schemas, crud, utils
 from dependencies import get_db
+from problems import leaderboard
 
 
 router_jwt = APIRouter(tags=["JWT"])
@@ -12,7 +13,7 @@ router_user = APIRouter(tags=["User"])
 
 
 @router_jwt.post("/login/", response_model=schemas.TokenInfo)
-def issue_jwt_access_token(user: schemas.User = Depends(crud.validate_auth_user)):
+def issue_jwt_access_token(user: schemas.UserCredentials = Depends(crud.validate_auth_user)):
     jwt_payload = {
         "sub": user.id,
         "username": user.username,
@@ -30,13 +31,25 @@ async def create_user(
     return await crud.create_user(db=db, user_schema=user_schema)
 
 
+@router_user.get("/leaderboard/", response_model=schemas.Leaderboard)
+async def read_leaderboard(
+    theme_id: int = None,
+    limit: int = Query(10, ge=1, le=100),
+    user = Depends(crud.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await leaderboard.get_leaderboard(
+        db=db, theme_id=theme_id, limit=limit, user_id=user.id if user else None
+    )
+
+
 @router_user.get("/{user_id}/", response_model=schemas.User)
 async def get_one_user(user_id: int, db: AsyncSession = Depends(get_db)):
     return await crud.get_user_by_id(db=db, user_id=user_id)
 
 
 @router_user.get("/profile/me/", response_model=schemas.User)
-async def user_me(user: schemas.User = Depends(crud.get_current_user)):
+async def user_me(user: schemas.User = Depends(crud.get_current_user_full)):
     if not user:
         raise HTTPException(401, "Authentication error")
     return user
@@ -43,6 +43,22 @@ class UserFull(User):
     hash_password: bytes
 
 
+class UserCredentials(UserRegisterResponse):
+    hash_password: bytes
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: int
+    username: str
+    score: int
+
+
+class Leaderboard(BaseModel):
+    top: list[LeaderboardEntry]
+    me: LeaderboardEntry | None
+
+
 class UserLogin(BaseModel):
     username_or_email: str
     password: str
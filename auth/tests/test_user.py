@@ -1,9 +1,17 @@
 import pytest
 from httpx import AsyncClient
 
+from starlette.requests import Request
+
+from auth import crud
 from auth.utils import encode_jwt
 
 
+def bearer_request(token: str | None) -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
 class TestUser:
     @pytest.mark.anyio
     @pytest.mark.usefixtures("clear_users")
@@ -143,3 +151,16 @@ class TestUser:
         assert response.status_code == status_code
         if username is not None:
             assert response.json().get("username") == username
+
+    @pytest.mark.anyio
+    async def test_current_user_is_one_query(self, session, query_budget):
+        request = bearer_request(encode_jwt({"sub": 1}))
+        with query_budget(1):
+            user = await crud.get_current_user(request=request, db=session)
+        assert user.username == "test_user"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("token", [None, "not-a-jwt"])
+    async def test_current_user_is_anonymous_without_valid_token(self, session, query_budget, token):
+        with query_budget(0):
+            assert await crud.get_current_user(request=bearer_request(token), db=session) is None
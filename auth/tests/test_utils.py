@@ -0,0 +1,57 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from auth import utils
+
+
+@pytest.fixture
+def verified_tokens(monkeypatch) -> utils.VerifiedTokens:
+    tokens = utils.VerifiedTokens(max_entries=2)
+    monkeypatch.setattr(utils, "verified_tokens", tokens)
+    return tokens
+
+
+class TestJWT:
+    def test_verified_token_is_cached(self, verified_tokens, monkeypatch):
+        token = utils.encode_jwt({"sub": 1})
+        assert utils.decode_jwt(token)["sub"] == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("verified again")
+
+        monkeypatch.setattr(utils, "decode", fail)
+        assert utils.decode_jwt(token)["sub"] == 1
+
+    def test_tampered_token_is_rejected(self, verified_tokens):
+        token = utils.encode_jwt({"sub": 1})
+        utils.decode_jwt(token)
+        header, payload, signature = token.split(".")
+        with pytest.raises(jwt.InvalidSignatureError):
+            utils.decode_jwt(f"{header}.{payload}.{signature[::-1]}")
+
+    def test_cache_entry_expires_with_token(self, verified_tokens):
+        verified_tokens.add("token", {"sub": 1, "exp": time.time() - 1})
+        assert verified_tokens.get("token") is None
+
+    def test_cache_is_bounded(self, verified_tokens):
+        exp = time.time() + 60
+        for token in ("a", "b", "c"):
+            verified_tokens.add(token, {"sub": token, "exp": exp})
+        assert verified_tokens.get("a") is None
+        assert verified_tokens.get("c") == {"sub": "c", "exp": exp}
+
+    @pytest.mark.parametrize(
+        "algorithm, private_key",
+        [
+            ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+            ("ES256", ec.generate_private_key(ec.SECP256R1())),
+            ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+        ]
+    )
+    def test_algorithms(self, algorithm: str, private_key):
+        token = utils.encode_jwt({"sub": 1}, key=private_key, algorithm=algorithm)
+        payload = utils.decode_jwt(token, key=private_key.public_key(), algorithm=algorithm)
+        assert payload["sub"] == 1
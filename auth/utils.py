@@ -1,19 +1,84 @@
+import asyncio
 import datetime
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import bcrypt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
 from fastapi import HTTPException
 from jwt import encode, decode
 
 import settings
-from settings import PUBLIC_KEY_PATH, PRIVATE_KEY_PATH
 
-ALGORITHM = "RS256"
+ALGORITHMS = ("RS256", "ES256", "EdDSA")
+if settings.JWT_ALGORITHM not in ALGORITHMS:
+    raise ValueError(f"JWT_ALGORITHM must be one of {ALGORITHMS}, not {settings.JWT_ALGORITHM}")
+
+# bcrypt releases the GIL, so a thread pool keeps hashing off the event loop
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+
+@lru_cache
+def get_private_key():
+    return load_pem_private_key(settings.PRIVATE_KEY_PATH.read_bytes(), password=None)
+
+
+@lru_cache
+def get_public_key():
+    return load_pem_public_key(settings.PUBLIC_KEY_PATH.read_bytes())
+
+
+class VerifiedTokens:
+    """
+    LRU of already verified tokens, keyed by their sha256 digest.
+    An entry is only served until the token's own exp.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str | bytes) -> bytes:
+        return hashlib.sha256(token.encode() if isinstance(token, str) else token).digest()
+
+    def get(self, token: str | bytes) -> dict | None:
+        key = self._key(token)
+        payload = self._entries.get(key)
+        if payload is None:
+            return None
+        if payload["exp"] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload.copy()
+
+    def add(self, token: str | bytes, payload: dict) -> None:
+        if self.max_entries <= 0 or "exp" not in payload:
+            return
+        key = self._key(token)
+        self._entries[key] = payload.copy()
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokens(max_entries=settings.VERIFIED_TOKEN_CACHE_SIZE)
 
 
 def encode_jwt(
         payload: dict,
-        key: str = PRIVATE_KEY_PATH.read_text(),
-        algorithm: str = ALGORITHM,
+        key=None,
+        algorithm: str = settings.JWT_ALGORITHM,
         expires_sec: int = settings.ACCESS_TOKEN_LIFETIME_SEC
 ) -> str:
     to_encode = payload.copy()
@@ -23,25 +88,45 @@ def encode_jwt(
         exp=exp,
         iat=now
     )
+    if key is None:
+        key = get_private_key()
     return encode(payload=to_encode, key=key, algorithm=algorithm)
 
 
 def decode_jwt(
         token: str | bytes,
-        key: str = PUBLIC_KEY_PATH.read_text(),
-        algorithm: str = ALGORITHM,
+        key=None,
+        algorithm: str = settings.JWT_ALGORITHM,
 ) -> dict:
-    return decode(jwt=token, key=key, algorithms=[algorithm])
+    if key is not None:
+        return decode(jwt=token, key=key, algorithms=[algorithm])
+    payload = verified_tokens.get(token)
+    if payload is None:
+        payload = decode(jwt=token, key=get_public_key(), algorithms=[algorithm])
+        verified_tokens.add(token, payload)
+    return payload
 
 
 def hash_password(password: str) -> bytes:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
 
 
 def validate_password(password: str, hashed_password: bytes) -> bool:
     return bcrypt.checkpw(password.encode(), hashed_password)
 
 
+async def hash_password_async(password: str) -> bytes:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hashing_executor, hash_password, password)
+
+
+async def validate_password_async(password: str, hashed_password: bytes) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hashing_executor, validate_password, password, hashed_password
+    )
+
+
 def validate_password_registration(password1: str, password2: str) -> None | HTTPException:
     if not password1 == password2:
         raise HTTPException(400, "Passwords do not match.")
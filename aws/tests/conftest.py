@@ -0,0 +1,33 @@
+import struct
+import zlib
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from aws import utils
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+@pytest.fixture()
+def png_bytes() -> bytes:
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00"))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+@pytest.fixture()
+def s3_client(monkeypatch):
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=utils.BUCKET_NAME)
+        monkeypatch.setattr(utils, "get_s3_client", lambda: client)
+        yield client
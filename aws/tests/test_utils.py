@@ -0,0 +1,65 @@
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from prometheus_client import REGISTRY
+
+from aws import utils
+
+
+class TestUploadImage:
+    @pytest.mark.anyio
+    async def test_upload_images(self, s3_client, png_bytes: bytes):
+        files = [
+            UploadFile(file=BytesIO(png_bytes), filename=f"image_{i}.png")
+            for i in range(3)
+        ]
+        sample = "s3_upload_duration_seconds_count"
+        uploads = REGISTRY.get_sample_value(sample, {"outcome": "success"}) or 0
+        urls = await utils.upload_images(files=files, directory="explanations")
+        assert len(set(urls)) == 3
+        assert REGISTRY.get_sample_value(sample, {"outcome": "success"}) == uploads + 3
+
+        objects = s3_client.list_objects_v2(Bucket=utils.BUCKET_NAME)["Contents"]
+        assert len(objects) == 3
+        for obj in objects:
+            assert obj["Key"].startswith("explanations")
+            assert obj["Key"].endswith(".png")
+            head = s3_client.head_object(Bucket=utils.BUCKET_NAME, Key=obj["Key"])
+            assert head["ContentType"] == "image/png"
+            assert head["ContentLength"] == len(png_bytes)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "contents",
+        [
+            b"",
+            b"just some text, definitely not an image",
+        ]
+    )
+    async def test_upload_image_rejected(self, s3_client, contents: bytes):
+        file = UploadFile(file=BytesIO(contents), filename="image.png")
+        with pytest.raises(HTTPException) as exc_info:
+            await utils.upload_image(file=file, directory="explanations")
+        assert exc_info.value.status_code == 400
+        assert "Contents" not in s3_client.list_objects_v2(Bucket=utils.BUCKET_NAME)
+
+    @pytest.mark.anyio
+    async def test_upload_image_too_large(self, s3_client, png_bytes: bytes):
+        contents = png_bytes + bytes(utils.MAX_FILE_SIZE)
+        file = UploadFile(file=BytesIO(contents), filename="image.png")
+        with pytest.raises(HTTPException) as exc_info:
+            await utils.upload_image(file=file, directory="explanations")
+        assert exc_info.value.status_code == 400
+        assert file.file.tell() == 0
+
+    @pytest.mark.anyio
+    async def test_upload_images_all_or_nothing(self, s3_client, png_bytes: bytes):
+        files = [
+            UploadFile(file=BytesIO(png_bytes), filename="image.png"),
+            UploadFile(file=BytesIO(b"not an image"), filename="image.png"),
+            UploadFile(file=BytesIO(png_bytes), filename="image.png"),
+        ]
+        with pytest.raises(HTTPException):
+            await utils.upload_images(files=files, directory="explanations")
+        assert "Contents" not in s3_client.list_objects_v2(Bucket=utils.BUCKET_NAME)
@@ -1,43 +1,86 @@
+import asyncio
 import os.path
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from uuid import uuid4
 
-import boto3
 import magic
 from fastapi import UploadFile, HTTPException
 
+import metrics
 import settings
 
 
 KB = 1024
 MB = KB * 1024
 
+MAX_FILE_SIZE = 3 * MB
+SNIFF_SIZE = 2 * KB
+
 SUPPORTED_FILE_TYPES = {
     "image/png": "png",
     "image/jpeg": "jpg",
 }
 
-session = boto3.Session(
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+BUCKET_NAME = settings.AWS_STORAGE_BUCKET_NAME
+
+upload_executor = ThreadPoolExecutor(
+    max_workers=settings.S3_UPLOAD_CONCURRENCY,
+    thread_name_prefix="s3-upload",
 )
 
-BUCKET_NAME = settings.AWS_STORAGE_BUCKET_NAME
 
-s3 = session.resource("s3")
-bucket = s3.Bucket(BUCKET_NAME)
+# boto3 takes a good part of a second to import, so it's only loaded on the first upload
+@lru_cache
+def get_s3_client():
+    import boto3
 
+    session = boto3.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    )
+    # Unlike resources, boto3 clients are thread-safe, so one is shared by the executor
+    return session.client("s3")
 
-async def upload_image(file: UploadFile, directory: str) -> str:
-    contents = await file.read()
-    size = len(contents)
 
-    if not 0 < size <= 3 * MB:
+@lru_cache
+def get_transfer_config():
+    from boto3.s3.transfer import TransferConfig
+
+    # Uploads already run in upload_executor, so s3transfer shouldn't start threads of its own.
+    # Files above the threshold go out as multipart uploads in chunks of this size.
+    return TransferConfig(
+        multipart_threshold=8 * MB,
+        multipart_chunksize=8 * MB,
+        use_threads=False,
+    )
+
+
+def get_file_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(position)
+    return size
+
+
+async def upload_image(file: UploadFile, directory: str) -> str:
+    """
+    Validates the upload from its size and first bytes only, then streams the
+    spooled file to S3, so the whole image is never held in memory.
+    """
+    size = get_file_size(file)
+    if not 0 < size <= MAX_FILE_SIZE:
         raise HTTPException(
             status_code=400,
             detail="Supported file size is up to 3 MB"
         )
 
-    file_type = magic.from_buffer(buffer=contents, mime=True)
+    await file.seek(0)
+    head = await file.read(SNIFF_SIZE)
+    file_type = magic.from_buffer(buffer=head, mime=True)
     if file_type not in SUPPORTED_FILE_TYPES:
         raise HTTPException(
             status_code=400,
@@ -46,8 +89,62 @@ async def upload_image(file: UploadFile, directory: str) -> str:
                 f"Supported types are {list(SUPPORTED_FILE_TYPES.values())}"
             )
         )
+    await file.seek(0)
+
     file_name = os.path.join(directory, f"{uuid4()}.{SUPPORTED_FILE_TYPES[file_type]}")
-    bucket.put_object(Body=contents, Key=file_name, ContentType=file_type)
-    url = settings.AWS_S3_CUSTOM_DOMAIN + file_name.replace("\\", "%5C")
-    return url
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        await loop.run_in_executor(
+            upload_executor,
+            partial(
+                get_s3_client().upload_fileobj,
+                file.file,
+                BUCKET_NAME,
+                file_name,
+                ExtraArgs={"ContentType": file_type},
+                Config=get_transfer_config()
+            )
+        )
+        outcome = "success"
+    finally:
+        metrics.S3_UPLOAD_DURATION.labels(outcome).observe(time.perf_counter() - start)
+    metrics.S3_UPLOAD_BYTES.inc(size)
+    return get_image_url(file_name)
+
+
+async def upload_images(files: list[UploadFile], directory: str) -> list[str]:
+    """
+    Uploads concurrently, at most S3_UPLOAD_CONCURRENCY files at a time.
+    Either all files end up in the bucket or none of them do.
+    """
+    results = await asyncio.gather(
+        *(upload_image(file=file, directory=directory) for file in files),
+        return_exceptions=True
+    )
+    urls = [result for result in results if isinstance(result, str)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        if urls:
+            await delete_images(urls)
+        raise errors[0]
+    return urls
+
+
+async def delete_images(urls: list[str]) -> None:
+    objects = [{"Key": get_image_key(url)} for url in urls]
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        upload_executor,
+        partial(get_s3_client().delete_objects, Bucket=BUCKET_NAME, Delete={"Objects": objects})
+    )
+
+
+def get_image_url(key: str) -> str:
+    return settings.AWS_S3_CUSTOM_DOMAIN + key.replace("\\", "%5C")
+
+
+def get_image_key(url: str) -> str:
+    return url.removeprefix(settings.AWS_S3_CUSTOM_DOMAIN).replace("%5C", "\\")
 
@@ -0,0 +1,81 @@
+"""
+Cold start benchmark.
+
+Starts fresh interpreters and times `import main`, then the lifespan startup
+(keys and pool warm-up) and the first GET /themes/ after it. It also lists the
+heavy modules that were loaded by the import alone. --no-lifespan skips the
+startup, so the first request pays for the engine and its connection itself.
+Run it against a prepared database (see README):
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --no-lifespan
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("boto3", "botocore", "asyncpg", "cryptography.hazmat.backends.openssl")
+
+CHILD = """
+import asyncio, json, sys, time
+
+start = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in {modules!r} if name in sys.modules]
+
+from httpx import AsyncClient, ASGITransport
+
+
+async def first_request():
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://cold") as client:
+        start = time.perf_counter()
+        (await client.get("/themes/")).raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+
+async def run():
+    startup_ms = 0.0
+    if {lifespan!r}:
+        start = time.perf_counter()
+        async with main.app.router.lifespan_context(main.app):
+            startup_ms = (time.perf_counter() - start) * 1000
+            return startup_ms, await first_request()
+    return startup_ms, await first_request()
+
+startup_ms, request_ms = asyncio.run(run())
+print(json.dumps({{
+    "import_ms": import_ms, "startup_ms": startup_ms, "request_ms": request_ms, "loaded": loaded
+}}))
+"""
+
+
+def measure(lifespan: bool) -> dict:
+    code = CHILD.format(modules=HEAVY_MODULES, lifespan=lifespan)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-lifespan", action="store_true", help="skip the startup handler")
+    args = parser.parse_args()
+
+    runs = [measure(lifespan=not args.no_lifespan) for _ in range(args.runs)]
+    for key, label in (
+        ("import_ms", "import main"),
+        ("startup_ms", "lifespan startup"),
+        ("request_ms", "first GET /themes/"),
+    ):
+        values = [run[key] for run in runs]
+        print(f"{label:<20} median {statistics.median(values):7.1f} ms  min {min(values):7.1f} ms")
+    print(f"loaded by the import: {', '.join(runs[-1]['loaded']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+JWT verification benchmark.
+
+Verifies the same access token over and over with throwaway keys for each
+supported algorithm and prints verifications per second for three paths:
+the PEM text handed to PyJWT on every call (as before), a parsed key object,
+and auth.utils.decode_jwt with the verified-token cache. No database needed:
+
+    python -m benchmarks.jwt_verify --seconds 1
+"""
+import argparse
+import time
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+from jwt import decode
+
+from auth import utils
+
+KEYS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def rate(verify, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        for _ in range(50):
+            verify()
+        count += 50
+    return count / elapsed
+
+
+def run(seconds: float) -> None:
+    print(f"{'algorithm':<10} {'pem':>10} {'key object':>12} {'cached':>12}  (verifications/s)")
+    for algorithm, generate in KEYS.items():
+        private_key = generate()
+        public_key = private_key.public_key()
+        public_pem = public_key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+        token = utils.encode_jwt({"sub": 1}, key=private_key, algorithm=algorithm)
+
+        utils.verified_tokens.clear()
+        original = utils.get_public_key
+        utils.get_public_key = lambda: public_key
+        try:
+            pem = rate(lambda: decode(token, key=public_pem, algorithms=[algorithm]), seconds)
+            parsed = rate(lambda: decode(token, key=public_key, algorithms=[algorithm]), seconds)
+            cached = rate(lambda: utils.decode_jwt(token, algorithm=algorithm), seconds)
+        finally:
+            utils.get_public_key = original
+            utils.verified_tokens.clear()
+        print(f"{algorithm:<10} {pem:>10.0f} {parsed:>12.0f} {cached:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each measurement")
+    args = parser.parse_args()
+    run(args.seconds)
+
+
+if __name__ == "__main__":
+    main()
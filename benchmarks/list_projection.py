@@ -0,0 +1,132 @@
+"""
+List endpoint projection benchmark.
+
+Builds a page of GET /problems/, /questions/ and /themes/ the way it used to be
+built (full ORM entities plus eager loads) and the way crud builds it now
+(selected columns into dto rows), validates both into the response schema and
+reports per-page CPU time and peak allocated memory. The cache is bypassed.
+Run it against a prepared database (see README):
+
+    python -m benchmarks.list_projection --limit 100 --repeat 50
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from database import SessionLocal
+from problems import crud, models, schemas
+
+
+async def orm_problems(db, limit: int) -> list:
+    stmt = (
+        select(models.Problem)
+        .options(joinedload(models.Problem.theme))
+        .options(joinedload(models.Problem.created_by))
+        .options(selectinload(models.Problem.images))
+        .order_by(models.Problem.id)
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).unique().scalars().all())
+
+
+async def orm_questions(db, limit: int) -> list:
+    stmt = (
+        select(models.Question)
+        .options(joinedload(models.Question.created_by))
+        .options(joinedload(models.Question.theme))
+        .options(selectinload(models.Question.responses))
+        .order_by(models.Question.created_at.desc(), models.Question.id.desc())
+        .limit(limit)
+    )
+    return list((await db.execute(stmt)).unique().scalars().all())
+
+
+async def orm_themes(db, limit: int) -> list:
+    problems_num = (
+        select(func.count(models.Problem.id))
+        .where(models.Problem.theme_id == models.Theme.id)
+        .scalar_subquery()
+    )
+    questions_num = (
+        select(func.count(models.Question.id))
+        .where(models.Question.theme_id == models.Theme.id)
+        .scalar_subquery()
+    )
+    stmt = select(models.Theme, problems_num, questions_num).limit(limit)
+    themes = []
+    for theme, theme_problems_num, theme_questions_num in (await db.execute(stmt)).all():
+        theme.problems_num = theme_problems_num
+        theme.questions_num = theme_questions_num
+        themes.append(theme)
+    return themes
+
+
+async def projected_problems(db, limit: int) -> list:
+    return await crud.get_all_problems.__wrapped__(db=db, limit=limit)
+
+
+async def projected_questions(db, limit: int) -> list:
+    return await crud.get_all_questions(
+        offset=0, limit=limit, theme_id=None, keywords=None, db=db
+    )
+
+
+async def projected_themes(db, limit: int) -> list:
+    return (await crud.get_all_themes.__wrapped__(db=db))[:limit]
+
+
+CASES = {
+    "problems": (schemas.ProblemList, orm_problems, projected_problems),
+    "questions": (schemas.QuestionList, orm_questions, projected_questions),
+    "themes": (schemas.Theme, orm_themes, projected_themes),
+}
+
+
+async def build_page(load, adapter: TypeAdapter, limit: int) -> int:
+    async with SessionLocal() as db:
+        page = adapter.validate_python(await load(db, limit), from_attributes=True)
+        adapter.dump_json(page)
+        return len(page)
+
+
+async def measure(load, adapter: TypeAdapter, limit: int, repeat: int) -> tuple[int, float, float]:
+    rows = await build_page(load, adapter, limit)
+
+    start = time.process_time()
+    for _ in range(repeat):
+        await build_page(load, adapter, limit)
+    cpu_ms = (time.process_time() - start) / repeat * 1000
+
+    tracemalloc.start()
+    await build_page(load, adapter, limit)
+    peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return rows, cpu_ms, peak_kib
+
+
+async def run(limit: int, repeat: int) -> None:
+    for name, (schema, orm_load, projected_load) in CASES.items():
+        adapter = TypeAdapter(list[schema])
+        for label, load in (("orm", orm_load), ("projection", projected_load)):
+            rows, cpu_ms, peak_kib = await measure(load, adapter, limit, repeat)
+            print(
+                f"{name:<10} {label:<11} rows {rows:>4}  "
+                f"cpu {cpu_ms:7.2f} ms/page  peak {peak_kib:8.1f} KiB"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
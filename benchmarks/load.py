@@ -0,0 +1,236 @@
+"""
+Mixed workload load driver.
+
+Replays a weighted mix of reads and writes against the app, in-process through
+ASGITransport by default or against a running server with --base-url. It
+reports requests per second and p50/p95/p99 latency per endpoint and saves the
+run as JSON under benchmarks/results/. Seed the database with benchmarks.seed
+first; the driver samples ids from it and logs in with the seeded password.
+
+    python -m benchmarks.load --duration 30 --concurrency 20
+    python -m benchmarks.load --mix problems=10,read=10,submit=1 --compare benchmarks/results/before.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+
+import settings
+from auth import models as auth_models
+from auth.utils import encode_jwt
+from benchmarks.seed import PASSWORD
+from database import SessionLocal
+from problems import models
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = "problems=30,read=30,comments=10,submit=10,like=10,leaderboard=5,login=5"
+
+
+class Dataset:
+    def __init__(self, max_user_id: int, problem_ids: list[int], comments: list[tuple[int, int]]):
+        self.max_user_id = max_user_id
+        self.problem_ids = problem_ids
+        self.comments = comments
+
+
+async def load_dataset(sample: int) -> Dataset:
+    async with SessionLocal() as db:
+        max_user_id = await db.scalar(select(func.max(auth_models.User.id)))
+        problem_ids = list(await db.scalars(
+            select(models.Problem.id).order_by(func.random()).limit(sample)
+        ))
+        comments = [
+            tuple(row) for row in await db.execute(
+                select(models.Comment.id, models.Comment.problem_id)
+                .order_by(func.random())
+                .limit(sample)
+            )
+        ]
+    if not max_user_id or not problem_ids:
+        raise SystemExit("The database is empty, run python -m benchmarks.seed first")
+    return Dataset(max_user_id, problem_ids, comments)
+
+
+class Workload:
+    def __init__(self, client: AsyncClient, dataset: Dataset, rng: random.Random):
+        self.client = client
+        self.dataset = dataset
+        self.rng = rng
+
+    def auth(self) -> dict:
+        user_id = self.rng.randint(1, self.dataset.max_user_id)
+        return {"Authorization": f"Bearer {encode_jwt({'sub': user_id})}"}
+
+    def problem_id(self) -> int:
+        return self.rng.choice(self.dataset.problem_ids)
+
+    async def problems(self):
+        return await self.client.get("/problems/", params={"limit": 100})
+
+    async def read(self):
+        return await self.client.get(f"/problems/{self.problem_id()}/")
+
+    async def comments(self):
+        return await self.client.get(f"/problems/{self.problem_id()}/comments/", headers=self.auth())
+
+    async def submit(self):
+        problem_id = self.problem_id()
+        # seeded answers are the problem id, so half of the submissions are right
+        answer = str(problem_id) if self.rng.random() < 0.5 else "wrong"
+        return await self.client.post(
+            f"/problems/{problem_id}/submit/", params={"answer": answer}, headers=self.auth()
+        )
+
+    async def like(self):
+        if not self.dataset.comments:
+            return await self.read()
+        comment_id, problem_id = self.rng.choice(self.dataset.comments)
+        return await self.client.post(
+            f"/problems/{problem_id}/comments/{comment_id}/like/", headers=self.auth()
+        )
+
+    async def leaderboard(self):
+        return await self.client.get("/users/leaderboard/", headers=self.auth())
+
+    async def login(self):
+        user_id = self.rng.randint(1, self.dataset.max_user_id)
+        return await self.client.post(
+            "/jwt/login/", data={"username_or_email": f"user_{user_id}", "password": PASSWORD}
+        )
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(Workload, name):
+            raise SystemExit(f"Unknown operation {name!r} in --mix")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def percentile(latencies: list[float], q: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+
+async def worker(workload: Workload, weights: dict[str, int], deadline: float, results: dict) -> None:
+    names, counts = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        name = workload.rng.choices(names, counts)[0]
+        start = time.perf_counter()
+        try:
+            response = await getattr(workload, name)()
+            status = str(response.status_code)
+        except Exception as e:
+            status = type(e).__name__
+        results[name]["latencies"].append((time.perf_counter() - start) * 1000)
+        results[name]["statuses"][status] += 1
+
+
+def summarize(results: dict, elapsed: float) -> dict:
+    summary = {}
+    for name, result in sorted(results.items()):
+        latencies = sorted(result["latencies"])
+        if not latencies:
+            continue
+        summary[name] = {
+            "requests": len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "statuses": dict(result["statuses"]),
+        }
+    return summary
+
+
+def print_summary(summary: dict, baseline: dict | None) -> None:
+    print(f"{'operation':<12} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for name, row in summary.items():
+        line = (
+            f"{name:<12} {row['requests']:>8} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}  {row['statuses']}"
+        )
+        if baseline and name in baseline:
+            before = baseline[name]
+            line += f"  (rps {before['rps']:.1f}, p95 {before['p95_ms']:.1f} ms before)"
+        print(line)
+
+
+def get_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> None:
+    weights = parse_mix(args.mix)
+    dataset = await load_dataset(args.sample)
+    rng = random.Random(args.seed)
+    results = defaultdict(lambda: {"latencies": [], "statuses": defaultdict(int)})
+
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from main import app
+
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://load", timeout=30)
+
+    async with client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            worker(Workload(client, dataset, random.Random(rng.random())), weights, deadline, results)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed)
+    baseline = json.loads(Path(args.compare).read_text())["results"] if args.compare else None
+    print_summary(summary, baseline)
+
+    run_info = {
+        "started_at": datetime.datetime.utcnow().isoformat(),
+        "revision": get_revision(),
+        "target": args.base_url or "in-process",
+        "duration_sec": elapsed,
+        "concurrency": args.concurrency,
+        "mix": weights,
+        "seed": args.seed,
+        "pool": {"size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW},
+        "results": summary,
+    }
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"load-{datetime.datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run_info, indent=2))
+    print(f"saved to {output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight, comma separated")
+    parser.add_argument("--base-url", help="a running server instead of the app in-process")
+    parser.add_argument("--sample", type=int, default=10_000, help="ids sampled from the database")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="where to save the JSON results")
+    parser.add_argument("--compare", help="results JSON of an earlier run to print next to this one")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
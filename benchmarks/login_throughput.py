@@ -0,0 +1,92 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent POST /jwt/login/ requests at the app in-process while a
+probe keeps calling GET /themes/, so an event loop blocked by bcrypt shows
+up as probe latency. Run it against a prepared database (see README):
+
+    python -m benchmarks.login_throughput --requests 200 --concurrency 20
+    python -m benchmarks.login_throughput --inline   # old, blocking behaviour
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient, ASGITransport
+
+from auth import utils
+from main import app
+
+
+async def _inline_hash(password: str) -> bytes:
+    return utils.hash_password(password)
+
+
+async def _inline_validate(password: str, hashed_password: bytes) -> bool:
+    return utils.validate_password(password, hashed_password)
+
+
+async def login_worker(client: AsyncClient, queue: asyncio.Queue, data: dict) -> None:
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        response = await client.post("/jwt/login/", data=data)
+        response.raise_for_status()
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event, latencies: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/themes/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def run(requests: int, concurrency: int, username: str, password: str) -> None:
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    data = {"username_or_email": username, "password": password}
+    latencies = []
+    stop = asyncio.Event()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        probe_task = asyncio.create_task(probe(client, stop, latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker(client, queue, data) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    print(f"logins:            {requests} in {elapsed:.2f}s ({requests / elapsed:.1f}/s)")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"probe GET /themes/: median {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--username", default="test_user")
+    parser.add_argument("--password", default="asdf!qwe123")
+    parser.add_argument(
+        "--inline", action="store_true", help="hash on the event loop, as before the executor"
+    )
+    args = parser.parse_args()
+
+    if args.inline:
+        utils.hash_password_async = _inline_hash
+        utils.validate_password_async = _inline_validate
+        import auth.crud
+        auth.crud.validate_password_async = _inline_validate
+
+    asyncio.run(run(args.requests, args.concurrency, args.username, args.password))
+
+
+if __name__ == "__main__":
+    main()
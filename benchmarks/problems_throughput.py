@@ -0,0 +1,82 @@
+"""
+GET /problems/ throughput benchmark.
+
+Drives the app in-process with concurrent GET /problems/?limit=100 requests and
+reports requests per second and latency. --baseline restores the stdlib json
+response class and FastAPI's second response_model validation, which is how
+the routers answered before the orjson default. Run it against a prepared
+database (see README) with at least `limit` problems in it:
+
+    python -m benchmarks.problems_throughput --requests 500 --concurrency 10
+    python -m benchmarks.problems_throughput --baseline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, request_response
+from httpx import AsyncClient, ASGITransport
+
+import serialization
+from main import app
+
+
+def use_baseline() -> None:
+    serialization.schema_response = lambda content, response: content
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.response_class = JSONResponse
+            route.app = request_response(route.get_route_handler())
+
+
+async def worker(client: AsyncClient, queue: asyncio.Queue, url: str, latencies: list[float]) -> None:
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(requests: int, concurrency: int, limit: int) -> None:
+    url = f"/problems/?limit={limit}"
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+    latencies = []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        rows = len((await client.get(url)).json())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, queue, url, latencies) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"GET {url} ({rows} rows): {requests} in {elapsed:.2f}s ({requests / elapsed:.1f}/s)")
+    print(f"latency: median {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument(
+        "--baseline", action="store_true", help="stdlib json and double validation, as before"
+    )
+    args = parser.parse_args()
+
+    if args.baseline:
+        use_baseline()
+
+    asyncio.run(run(args.requests, args.concurrency, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Synthetic dataset generator.
+
+Bulk-loads themes, users, problems, solves (problem_user), comments and
+questions into the database from POSTGRES_DATABASE_URL with COPY. The same
+--seed always produces the same rows. Every user gets the password below, so
+benchmarks.load can log in as any of them. Scores (overall and per theme) and
+completion counters are derived from the generated solves. Run migrations
+first; --truncate empties the tables (and resets their ids) before loading:
+
+    python -m benchmarks.seed --truncate
+    python -m benchmarks.seed --truncate --users 1000 --problems 2000 --solves 50000
+"""
+import argparse
+import asyncio
+import datetime
+import random
+import time
+from typing import Iterator
+
+import asyncpg
+
+import settings
+from auth import utils
+from enums import DifficultyLevel
+
+PASSWORD = "benchmark-password1"
+WORDS = (
+    "velocity acceleration mass force energy momentum charge field wave frequency "
+    "lens mirror refraction pressure volume temperature entropy orbit pendulum spring "
+    "friction current voltage resistance magnet photon electron nucleus decay gravity"
+).split()
+TABLES = (
+    "comment_response", "comment_reaction", "comment", "question_response", "question",
+    "explanation_image", "theme_score", "problem_user", "problem", "theme", '"user"',
+)
+CHUNK = 100_000
+
+
+def get_dsn() -> str:
+    return settings.POSTGRES_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def chunks(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def copy(conn: asyncpg.Connection, table: str, columns: tuple[str, ...], rows) -> None:
+    start = time.perf_counter()
+    count = 0
+    for chunk in chunks(rows):
+        await conn.copy_records_to_table(table, records=chunk, columns=columns)
+        count += len(chunk)
+    print(f"{table:<15} {count:>10} rows in {time.perf_counter() - start:6.1f}s")
+
+
+def themes(args) -> Iterator[tuple]:
+    for theme_id in range(1, args.themes + 1):
+        yield theme_id, f"Theme {theme_id}", f"Everything about theme {theme_id}"
+
+
+def users(args, hash_password: bytes) -> Iterator[tuple]:
+    for user_id in range(1, args.users + 1):
+        yield user_id, f"user_{user_id}", f"user_{user_id}@example.com", 0, False, hash_password
+
+
+def problems(args, rng: random.Random) -> Iterator[tuple]:
+    levels = [level.name for level in DifficultyLevel]
+    for problem_id in range(1, args.problems + 1):
+        yield (
+            problem_id,
+            f"Problem {problem_id}",
+            rng.choice(levels),
+            sentence(rng, rng.randint(20, 120)),
+            str(problem_id),
+            sentence(rng, 30),
+            rng.randint(1, args.themes),
+            rng.randint(1, args.users),
+        )
+
+
+def solves(args, rng: random.Random) -> Iterator[tuple]:
+    """Spreads --solves distinct (problem, user) pairs over the users, skewed towards popular problems."""
+    per_user = min(args.solves // args.users, args.problems)
+    extra = args.solves - per_user * args.users
+    for user_id in range(1, args.users + 1):
+        count = min(per_user + (1 if user_id <= extra else 0), args.problems)
+        solved = set()
+        while len(solved) < count:
+            solved.add(min(int(rng.paretovariate(1.2)), args.problems))
+            if len(solved) < count and rng.random() < 0.5:
+                solved.add(rng.randint(1, args.problems))
+        for problem_id in solved:
+            yield problem_id, user_id
+
+
+def comments(args, rng: random.Random, now: datetime.datetime) -> Iterator[tuple]:
+    for comment_id in range(1, args.comments + 1):
+        yield (
+            comment_id,
+            sentence(rng, rng.randint(5, 40)),
+            rng.randint(0, 50),
+            rng.randint(0, 10),
+            rng.randint(1, args.users),
+            rng.randint(1, args.problems),
+            now - datetime.timedelta(minutes=rng.randint(0, 525_600)),
+        )
+
+
+def questions(args, rng: random.Random, now: datetime.datetime) -> Iterator[tuple]:
+    for question_id in range(1, args.questions + 1):
+        yield (
+            question_id,
+            sentence(rng, rng.randint(3, 10)),
+            sentence(rng, rng.randint(20, 80)),
+            rng.randint(1, args.themes),
+            rng.randint(1, args.users),
+            now - datetime.timedelta(minutes=rng.randint(0, 525_600)),
+        )
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.datetime.utcnow()
+    hash_password = utils.hash_password(PASSWORD)
+
+    conn = await asyncpg.connect(get_dsn())
+    try:
+        async with conn.transaction():
+            if args.truncate:
+                await conn.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            await copy(conn, "theme", ("id", "name", "description"), themes(args))
+            await copy(
+                conn, "user",
+                ("id", "username", "email", "score", "is_superuser", "hash_password"),
+                users(args, hash_password)
+            )
+            await copy(
+                conn, "problem",
+                ("id", "name", "difficulty_level", "description", "answer", "explanation",
+                 "theme_id", "author_id"),
+                problems(args, rng)
+            )
+            await copy(conn, "problem_user", ("problem_id", "user_id"), solves(args, rng))
+            await copy(
+                conn, "comment",
+                ("id", "body", "likes", "dislikes", "author_id", "problem_id", "created_at"),
+                comments(args, rng, now)
+            )
+            await copy(
+                conn, "question",
+                ("id", "title", "description", "theme_id", "author_id", "created_at"),
+                questions(args, rng, now)
+            )
+
+            start = time.perf_counter()
+            await conn.execute("""
+                UPDATE problem SET completions = solved.count
+                FROM (SELECT problem_id, count(*) FROM problem_user GROUP BY problem_id) AS solved
+                WHERE problem.id = solved.problem_id
+            """)
+            await conn.execute("""
+                UPDATE "user" SET score = earned.score
+                FROM (
+                    SELECT problem_user.user_id,
+                           sum(CASE problem.difficulty_level
+                               WHEN 'EASY' THEN 5 WHEN 'MEDIUM' THEN 10 ELSE 20 END) AS score
+                    FROM problem_user JOIN problem ON problem.id = problem_user.problem_id
+                    GROUP BY problem_user.user_id
+                ) AS earned
+                WHERE "user".id = earned.user_id
+            """)
+            await conn.execute("""
+                INSERT INTO theme_score (theme_id, user_id, score)
+                SELECT problem.theme_id, problem_user.user_id,
+                       sum(CASE problem.difficulty_level
+                           WHEN 'EASY' THEN 5 WHEN 'MEDIUM' THEN 10 ELSE 20 END)
+                FROM problem_user JOIN problem ON problem.id = problem_user.problem_id
+                GROUP BY problem.theme_id, problem_user.user_id
+            """)
+            for table in ("theme", "user", "problem", "comment", "question"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM \"{table}\"))"
+                )
+            print(f"{'counters':<15} {'':>10}      in {time.perf_counter() - start:6.1f}s")
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--themes", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--problems", type=int, default=100_000)
+    parser.add_argument("--solves", type=int, default=5_000_000)
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--questions", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
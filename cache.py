@@ -0,0 +1,197 @@
+import inspect
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+
+import metrics
+import settings
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Walks the keys, so it's for clear() and maintenance, not the request path."""
+
+    @abstractmethod
+    async def get_generation(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump_generation(self, name: str) -> None:
+        ...
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+
+class NullCache(CacheBackend):
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def delete_prefix(self, prefix: str) -> None:
+        pass
+
+    async def get_generation(self, name: str) -> int:
+        return 0
+
+    async def bump_generation(self, name: str) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    Per-process LRU, entries also expire after their TTL. Invalidation only
+    reaches the worker that handled the write, the others serve stale entries
+    until they expire, so use RedisCache with more than one worker.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # kept apart from the LRU: an evicted generation would bring old entries back
+        self._generations: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def get_generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    async def bump_generation(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+
+class RedisCache(CacheBackend):
+    """Works with any redis.asyncio-compatible client, shared by all workers."""
+
+    def __init__(self, client, namespace: str = "physics:"):
+        self.client = client
+        self.namespace = namespace
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.namespace + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.namespace + key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.namespace + key for key in keys))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"{self.namespace}{prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def get_generation(self, name: str) -> int:
+        return int(await self.client.get(f"{self.namespace}generation:{name}") or 0)
+
+    async def bump_generation(self, name: str) -> None:
+        await self.client.incr(f"{self.namespace}generation:{name}")
+
+
+def create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        from redis import asyncio as redis
+
+        return RedisCache(redis.from_url(settings.REDIS_URL))
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+    return NullCache()
+
+
+backend = create_backend()
+
+
+def cached(key: str, schema: Any, generation: str | None = None) -> Callable:
+    """
+    Caches what the decorated crud function returns, validated into `schema`.
+    `key` is a template filled with the function's arguments, e.g. "themes:{theme_id}".
+    Keys of a `generation` carry its counter, so invalidate(generations=...)
+    drops all of them with one increment instead of walking the keys.
+    Callers may pass version=, e.g. the ETag of the rows the result is built from,
+    to key the entry by it too: an entry another worker failed to invalidate
+    then belongs to an older version and is never served for the current one.
+    """
+    adapter = TypeAdapter(schema)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, version: str | None = None, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            cache_key = key.format(**arguments.arguments)
+            if generation is not None:
+                cache_key = f"{cache_key}#{await backend.get_generation(generation)}"
+            if version is not None:
+                cache_key = f"{cache_key}@{version}"
+
+            raw = await backend.get(cache_key)
+            if raw is not None:
+                metrics.CACHE_REQUESTS.labels("hit").inc()
+                return adapter.validate_json(raw)
+
+            metrics.CACHE_REQUESTS.labels("miss").inc()
+            value = adapter.validate_python(await func(*args, **kwargs), from_attributes=True)
+            await backend.set(cache_key, adapter.dump_json(value), settings.CACHE_TTL_SEC)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(*keys: str, generations: tuple[str, ...] = ()) -> None:
+    """
+    Entries cached for a version of these keys stay: they are only ever
+    requested again for that same version, i.e. for the same rows.
+    """
+    await backend.delete(*keys)
+    for name in generations:
+        await backend.bump_generation(name)
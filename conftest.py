@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import AsyncIterator
 
 import pytest
@@ -5,6 +6,7 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession
 import nest_asyncio
 
+import query_stats
 from database import SessionLocal
 from main import app
 from auth.utils import encode_jwt
@@ -23,6 +25,25 @@ def anyio_backend() -> str:
     return "asyncio"
 
 
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(2): ... fails the test if the block issues more than 2 queries.
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with query_stats.track_queries() as stats:
+            yield stats
+        statements = "\n".join(
+            f"{count}x {statement}" for statement, count in stats.statements.items()
+        )
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries issued, the budget is {max_queries}:\n{statements}"
+        )
+
+    return budget
+
+
 @pytest.fixture(scope="module")
 async def client() -> AsyncIterator[AsyncClient]:
     async with AsyncClient(
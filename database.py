@@ -1,14 +1,78 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 import settings
+import metrics
+import query_stats
 
 SQLALCHEMY_DATABASE_URL = settings.POSTGRES_DATABASE_URL
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-)
-SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Reports how long each checkout waited, including opening a new connection, and the pool usage."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+            self._record_usage()
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        metrics.DB_POOL_SIZE.set(self.size())
+        metrics.DB_POOL_CHECKED_OUT.set(self.checkedout())
+        metrics.DB_POOL_OVERFLOW.set(self.overflow())
+
+
+# The engine (and with it the asyncpg driver) is only built on first use,
+# `database.engine` and `database.SessionLocal` still work through __getattr__
+@lru_cache
+def get_engine() -> AsyncEngine:
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    query_stats.instrument(engine.sync_engine)
+    return engine
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def warm_up_pool(connections: int) -> None:
+    """Opens `connections` pooled connections at once, so the first requests don't pay for them."""
+    engine = get_engine()
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(*(
+            stack.enter_async_context(engine.connect()) for _ in range(connections)
+        ))
 
 
 class Base(DeclarativeBase):
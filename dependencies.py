@@ -1,6 +1,8 @@
-from database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 
+import database
 
-async def get_db() -> SessionLocal:
-    async with SessionLocal() as session:
+
+async def get_db() -> AsyncSession:
+    async with database.get_sessionmaker()() as session:
         yield session
@@ -12,6 +12,11 @@ class ReactionType(Enum):
     DISLIKE = "Dislike"
 
 
+class CommentOrdering(Enum):
+    NEWEST = "newest"
+    TOP = "top"
+
+
 class ReactionOwner(Enum):
     COMMENT = "Comment"
     RESPONSE = "Response"
@@ -1,10 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+import database
+import settings
+from auth import utils as auth_utils
+from problems.leaderboard import leaderboard, keep_refreshed
 from problems.router import router_theme, router_problem, router_question
 from auth.router import router_jwt, router_user
+from metrics import MetricsMiddleware, router_metrics
+from query_stats import QueryStatsMiddleware
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    auth_utils.get_private_key()
+    auth_utils.get_public_key()
+    await database.warm_up_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
+    async with database.get_sessionmaker()() as db:
+        await leaderboard.build(db)
+    refresher = asyncio.create_task(keep_refreshed(settings.LEADERBOARD_REFRESH_SEC))
+    yield
+    refresher.cancel()
+    await database.get_engine().dispose()
 
-app = FastAPI()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 
 app.include_router(router_theme)
@@ -12,3 +35,7 @@ app.include_router(router_problem)
 app.include_router(router_question)
 app.include_router(router_jwt, prefix="/jwt")
 app.include_router(router_user, prefix="/users")
+app.include_router(router_metrics)
+
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
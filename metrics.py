@@ -0,0 +1,119 @@
+import atexit
+import os
+import time
+
+from fastapi import APIRouter, Response
+
+# Loads .env first: prometheus_client reads PROMETHEUS_MULTIPROC_DIR once, on import
+import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Finished HTTP requests",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ["method", "route"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled right now",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Connections kept in the pool", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened above pool_size", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+S3_UPLOAD_DURATION = Histogram(
+    "s3_upload_duration_seconds",
+    "Time spent uploading a single object to S3",
+    ["outcome"],
+)
+S3_UPLOAD_BYTES = Counter("s3_upload_bytes_total", "Bytes uploaded to S3")
+
+# Hit ratio: sum(rate(cache_requests_total{result="hit"}[5m])) / sum(rate(cache_requests_total[5m]))
+CACHE_REQUESTS = Counter("cache_requests_total", "Catalogue cache lookups", ["result"])
+
+# Requests that don't match any route share one label, so scanners can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    With PROMETHEUS_MULTIPROC_DIR set every worker writes its samples there and
+    the scrape aggregates all of them, whichever worker happens to answer it.
+    """
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+if settings.PROMETHEUS_MULTIPROC_DIR:
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(method, route_path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route_path, status_code).inc()
+            in_progress.dec()
+
+
+router_metrics = APIRouter(tags=["Metrics"])
+
+
+@router_metrics.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return Response(generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -1,12 +1,17 @@
 from fastapi import HTTPException
-from sqlalchemy import select, insert, func, or_, delete
+from sqlalchemy import (
+    select, insert, func, or_, delete, exists, update, tuple_, literal, literal_column, text
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 
 import auth.schemas
+import cache
 import enums
-from auth import crud as auth_crud, models as auth_models
-from problems import schemas, models
+from auth import models as auth_models
+from problems import schemas, models, pagination, dto
+from problems.leaderboard import leaderboard, PROBLEM_SCORES
 
 
 async def create_theme(db: AsyncSession, theme_schema: schemas.ThemeBase) -> schemas.Success:
@@ -14,49 +19,78 @@ async def create_theme(db: AsyncSession, theme_schema: schemas.ThemeBase) -> sch
     db.add(theme)
     await db.commit()
     await db.refresh(theme)
+    await cache.invalidate("themes:all")
     return schemas.Success()
 
 
-async def get_all_themes(db: AsyncSession) -> list[schemas.Theme]:
-    stmt = (
-        select(models.Theme)
-        .options(selectinload(models.Theme.problems))
-        .options(selectinload(models.Theme.questions))
+def select_themes_with_counts():
+    problems_num = (
+        select(func.count(models.Problem.id))
+        .where(models.Problem.theme_id == models.Theme.id)
+        .correlate(models.Theme)
+        .scalar_subquery()
+    )
+    questions_num = (
+        select(func.count(models.Question.id))
+        .where(models.Question.theme_id == models.Theme.id)
+        .correlate(models.Theme)
+        .scalar_subquery()
     )
+    return select(
+        models.Theme.id,
+        models.Theme.name,
+        models.Theme.description,
+        problems_num,
+        questions_num
+    )
+
+
+@cache.cached("themes:all", list[schemas.Theme])
+async def get_all_themes(db: AsyncSession) -> list[schemas.Theme]:
+    stmt = select_themes_with_counts()
     result = await db.execute(stmt)
-    themes = list(result.scalars().all())
-    for theme in themes:
-        theme.problems_num = len(theme.problems)
-        theme.questions_num = len(theme.questions)
-    return themes
+    return [dto.theme_from_row(row) for row in result]
 
 
+@cache.cached("themes:{theme_id}", schemas.Theme)
 async def get_theme_by_id(db: AsyncSession, theme_id: int) -> schemas.Theme:
-    stmt = (
-        select(models.Theme)
-        .options(selectinload(models.Theme.problems))
-        .options(selectinload(models.Theme.questions))
-        .filter_by(id=theme_id)
-    )
+    stmt = select_themes_with_counts().filter(models.Theme.id == theme_id)
     result = await db.execute(stmt)
-    theme = result.scalars().first()
-    if not theme:
+    row = result.first()
+    if not row:
         raise HTTPException(
             status_code=404,
             detail=f"Theme with id {theme_id} isn't found(("
         )
-    theme.problems_num = len(theme.problems)
-    theme.questions_num = len(theme.questions)
-    return theme
+    return dto.theme_from_row(row)
+
+
+async def read_snapshot(db: AsyncSession) -> None:
+    """Makes the reads that follow, a version and the body it describes, see one snapshot."""
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+async def get_themes_version(db: AsyncSession) -> tuple:
+    stmt = select(func.count(models.Theme.id), func.max(models.Theme.updated_at))
+    result = await db.execute(stmt)
+    return tuple(result.one())
+
+
+async def get_theme_version(db: AsyncSession, theme_id: int) -> tuple | None:
+    stmt = select(models.Theme.id, models.Theme.updated_at).filter_by(id=theme_id)
+    result = await db.execute(stmt)
+    row = result.first()
+    return tuple(row) if row else None
+
+
+async def touch_theme(db: AsyncSession, theme_id: int | None) -> None:
+    """Bumps updated_at when something the theme representation counts has changed."""
+    if theme_id is not None:
+        await db.execute(update(models.Theme).filter_by(id=theme_id).values(updated_at=func.now()))
 
 
 async def get_theme_by_name(name: str, db: AsyncSession) -> schemas.Theme | None:
-    stmt = (
-        select(models.Theme)
-        .options(selectinload(models.Theme.problems))
-        .options(selectinload(models.Theme.questions))
-        .filter_by(name=name)
-    )
+    stmt = select(models.Theme).filter_by(name=name)
     result = await db.execute(stmt)
     return result.scalars().one_or_none()
 
@@ -66,56 +100,89 @@ async def update_theme(
         theme_id: int,
         theme_schema: schemas.ThemeBase
 ) -> schemas.Theme:
-    theme = await get_theme_by_id(db=db, theme_id=theme_id)
-    theme.name = theme_schema.name
-    theme.description = theme_schema.description
+    await get_theme_by_id(db=db, theme_id=theme_id)
+    stmt = (
+        update(models.Theme)
+        .filter_by(id=theme_id)
+        .values(name=theme_schema.name, description=theme_schema.description)
+    )
+    await db.execute(stmt)
     await db.commit()
-    await db.refresh(theme)
-    return theme
+    await invalidate_theme(theme_id)
+    return await get_theme_by_id(db=db, theme_id=theme_id)
 
 
 async def delete_theme(db: AsyncSession, theme_id: int) -> schemas.Success:
-    theme = await get_theme_by_id(db=db, theme_id=theme_id)
-    await db.delete(theme)
+    await get_theme_by_id(db=db, theme_id=theme_id)
+    await db.execute(delete(models.Theme).filter_by(id=theme_id))
     await db.commit()
+    await invalidate_theme(theme_id)
     return schemas.Success()
 
 
+async def invalidate_theme(theme_id: int) -> None:
+    # Problem lists embed the name of their theme, a single problem is cached by
+    # an ETag that covers the theme's updated_at
+    await cache.invalidate("themes:all", f"themes:{theme_id}", generations=("problems:list",))
+
+
 async def delete_all_themes(db: AsyncSession) -> None:
     """This is for testing only"""
     stmt = delete(models.Theme)
     await db.execute(stmt)
     await db.commit()
+    await cache.backend.clear()
 
 
 async def get_problem_by_id(db: AsyncSession, problem_id: int) -> schemas.Problem:
+    comments_num = (
+        select(func.count(models.Comment.id))
+        .where(models.Comment.problem_id == models.Problem.id)
+        .correlate(models.Problem)
+        .scalar_subquery()
+    )
     stmt = (
-        select(models.Problem)
-        .options(selectinload(models.Problem.completed_by))
-        .options(selectinload(models.Problem.comments))
+        select(models.Problem, comments_num)
         .options(joinedload(models.Problem.theme))
         .options(joinedload(models.Problem.created_by))
         .options(selectinload(models.Problem.images))
         .filter_by(id=problem_id)
     )
     result = await db.execute(stmt)
-    problem = result.unique().scalars().first()
-    if not problem:
+    row = result.unique().first()
+    if not row:
         raise HTTPException(
             status_code=404,
             detail=f"Problem with id {problem_id} isn't found(("
         )
-    problem.completions = len(problem.completed_by)
-    if problem.comments:
-        problem.comments_num = (
-            len(problem.comments) if isinstance(problem.comments, list)
-            else len([problem.comments])
-        )
-    else:
-        problem.comments_num = 0
+    problem, comments_num = row
+    problem.comments_num = comments_num
     return problem
 
 
+async def get_problem_version(db: AsyncSession, problem_id: int) -> tuple | None:
+    stmt = (
+        select(models.Problem.id, models.Problem.updated_at, models.Theme.updated_at)
+        .outerjoin(models.Theme, models.Theme.id == models.Problem.theme_id)
+        .where(models.Problem.id == problem_id)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    return tuple(row) if row else None
+
+
+@cache.cached("problems:{problem_id}", schemas.Problem)
+async def get_problem(db: AsyncSession, problem_id: int) -> schemas.Problem:
+    return await get_problem_by_id(db=db, problem_id=problem_id)
+
+
+async def invalidate_problem(problem_id: int | None = None, theme_id: int | None = None) -> None:
+    keys = [f"problems:{problem_id}"] if problem_id is not None else []
+    if theme_id is not None:
+        keys.extend(("themes:all", f"themes:{theme_id}"))
+    await cache.invalidate(*keys, generations=("problems:list",))
+
+
 async def create_problem(
         db: AsyncSession,
         problem_schema: schemas.ProblemCreate,
@@ -137,38 +204,173 @@ async def create_problem(
         .values(**problem_schema.model_dump(), author_id=author.id)
     )
     await db.execute(stmt)
+    await touch_theme(db=db, theme_id=problem_schema.theme_id)
     await db.commit()
+    await invalidate_problem(theme_id=problem_schema.theme_id)
     return schemas.Success()
 
 
-async def get_all_problems(
-        db: AsyncSession,
+# Migration 80f372e374b6 creates these only where pg_trgm is available
+trigram_indexes: set[str] | None = None
+
+
+def trigram_index_name(column) -> str:
+    return f"ix_{column.table.name}_{column.key}_trgm"
+
+
+async def get_trigram_indexes(db: AsyncSession) -> set[str]:
+    global trigram_indexes
+    if trigram_indexes is None:
+        stmt = text("SELECT indexname FROM pg_indexes WHERE indexname LIKE :pattern")
+        trigram_indexes = set(await db.scalars(stmt, {"pattern": "%\\_trgm"}))
+    return trigram_indexes
+
+
+def keyword_search(keywords: str, *columns, trigram_indexes: set[str] = frozenset()):
+    """
+    Matches rows containing any of the keywords as a word (full-text index) and,
+    if every column has a trigram index, as a substring. An unindexed ILIKE in the
+    OR would make the whole filter a sequential scan. Returns the filter and a rank to order by.
+    """
+    words = keywords.split()
+    document = columns[0]
+    for column in columns[1:]:
+        document = document.op("||")(literal_column("' '")).op("||")(column)
+    vector = models.to_tsvector(document)
+    query = func.websearch_to_tsquery(models.SEARCH_CONFIG, " or ".join(words))
+    clauses = [vector.bool_op("@@")(query)]
+    if all(trigram_index_name(column) in trigram_indexes for column in columns):
+        clauses.extend(column.icontains(word) for column in columns for word in words)
+    return or_(*clauses), func.ts_rank(vector, query)
+
+
+def select_problems(
         offset: int = 0,
         limit: int = 100,
         theme_id: int | None = None,
         keywords: str | None = None,
-) -> list[schemas.ProblemList]:
+        cursor: str | None = None,
+        trigram_indexes: set[str] = frozenset(),
+):
     stmt = (
-        select(models.Problem)
-        .options(joinedload(models.Problem.theme))
-        .options(selectinload(models.Problem.comments))
-        .options(joinedload(models.Problem.created_by))
-        .options(selectinload(models.Problem.images))
-        .options(selectinload(models.Problem.completed_by))
-        .offset(offset)
+        select(
+            models.Problem.id,
+            models.Problem.name,
+            models.Problem.difficulty_level,
+            models.Problem.description,
+            models.Problem.completions,
+            models.Theme.id,
+            models.Theme.name,
+            auth_models.User.id,
+            auth_models.User.username,
+            auth_models.User.email,
+        )
+        .outerjoin(models.Problem.theme)
+        .outerjoin(models.Problem.created_by)
         .limit(limit)
     )
+    if cursor is not None:
+        if keywords:
+            raise HTTPException(400, "Cursor can't be combined with keywords, use offset")
+        last_id, = pagination.decode_cursor(cursor, size=1)
+        stmt = stmt.where(models.Problem.id > pagination.parse_id(last_id))
+    else:
+        stmt = stmt.offset(offset)
     if theme_id is not None:
-        stmt = stmt.where(models.Problem.theme.has(models.Theme.id == theme_id))
-    if keywords is not None:
-        keywords_ls = keywords.split(" ")
-        clauses = [models.Problem.description.icontains(keyword) for keyword in keywords_ls]
-        stmt = stmt.where(or_(*clauses))
+        stmt = stmt.where(models.Problem.theme_id == theme_id)
+    if keywords:
+        condition, rank = keyword_search(
+            keywords, models.Problem.description, trigram_indexes=trigram_indexes
+        )
+        stmt = stmt.where(condition).order_by(rank.desc())
+    return stmt.order_by(models.Problem.id)
+
+
+@cache.cached(
+    "problems:list:{offset}:{limit}:{theme_id}:{cursor}:{keywords!r}",
+    list[schemas.ProblemList],
+    generation="problems:list"
+)
+async def get_all_problems(
+        db: AsyncSession,
+        offset: int = 0,
+        limit: int = 100,
+        theme_id: int | None = None,
+        keywords: str | None = None,
+        cursor: str | None = None,
+) -> list[schemas.ProblemList]:
+    stmt = select_problems(
+        offset=offset,
+        limit=limit,
+        theme_id=theme_id,
+        keywords=keywords,
+        cursor=cursor,
+        trigram_indexes=await get_trigram_indexes(db) if keywords else frozenset(),
+    )
     result = await db.execute(stmt)
-    problems = list(result.unique().scalars().all())
-    for problem in problems:
-        problem.completions = len(problem.completed_by)
-    return problems
+    return [dto.problem_from_row(row) for row in result]
+
+
+async def is_problem_completed(db: AsyncSession, problem_id: int, user_id: int) -> bool:
+    stmt = select(
+        exists().where(
+            models.DoneProblem.problem_id == problem_id,
+            models.DoneProblem.user_id == user_id
+        )
+    )
+    return await db.scalar(stmt)
+
+
+async def record_solve(db: AsyncSession, problem_id: int, user_id: int, points: int) -> bool:
+    """
+    Marks the problem as solved by the user and awards the points, overall and
+    in the problem's theme, in a single statement. Returns False, changing
+    nothing, if the user had already solved it.
+    """
+    inserted = (
+        pg_insert(models.DoneProblem)
+        .values(problem_id=problem_id, user_id=user_id)
+        .on_conflict_do_nothing()
+        .returning(models.DoneProblem.problem_id)
+        .cte("inserted")
+    )
+    solved = exists(select(inserted.c.problem_id))
+    scored = (
+        update(auth_models.User)
+        .where(auth_models.User.id == user_id, solved)
+        .values(score=auth_models.User.score + points, score_updated_at=func.now())
+        .returning(auth_models.User.id)
+        .cte("scored")
+    )
+    counted = (
+        update(models.Problem)
+        .where(models.Problem.id == problem_id, solved)
+        .values(completions=models.Problem.completions + 1)
+        .returning(models.Problem.id)
+        .cte("counted")
+    )
+    theme_points = pg_insert(models.ThemeScore).from_select(
+        ["theme_id", "user_id", "score"],
+        select(models.Problem.theme_id, literal(user_id), literal(points))
+        .where(models.Problem.id == problem_id, models.Problem.theme_id.is_not(None), solved)
+    )
+    themed = (
+        theme_points.on_conflict_do_update(
+            index_elements=[models.ThemeScore.theme_id, models.ThemeScore.user_id],
+            set_={
+                "score": models.ThemeScore.score + theme_points.excluded.score,
+                "updated_at": func.now(),
+            }
+        )
+        .returning(models.ThemeScore.user_id)
+        .cte("themed")
+    )
+    stmt = select(func.count()).select_from(inserted).add_cte(scored, counted, themed)
+    is_new = bool(await db.scalar(stmt))
+    await db.commit()
+    if is_new:
+        await invalidate_problem(problem_id)
+    return is_new
 
 
 async def check_problem_answer(
@@ -177,29 +379,43 @@ async def check_problem_answer(
         user: auth_models.User,
         answer: schemas.ProblemAnswer,
 ) -> bool:
-    problem = await get_problem_by_id(db=db, problem_id=problem_id)
-    if problem.answer == answer.answer:
-        if user:
-            if user not in problem.completed_by:
-                problem.completed_by.append(user)
-                await auth_crud.increment_user_score(
-                    db=db,
-                    user=user,
-                    problem_level=problem.difficulty_level.value.lower()
-                )
-                await db.commit()
-        return True
-    else:
+    stmt = (
+        select(
+            models.Problem.answer,
+            models.Problem.difficulty_level,
+            models.Problem.theme_id
+        )
+        .filter_by(id=problem_id)
+    )
+    result = await db.execute(stmt)
+    problem = result.first()
+    if not problem:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Problem with id {problem_id} isn't found(("
+        )
+    if problem.answer != answer.answer:
         return False
+    if user:
+        user_id = user.id
+        points = PROBLEM_SCORES[problem.difficulty_level]
+        if await record_solve(db=db, problem_id=problem_id, user_id=user_id, points=points):
+            leaderboard.record_solve(user_id=user_id, theme_id=problem.theme_id, points=points)
+    return True
 
 
-async def create_explanation_image(
-        problem_id: int, image_url: str, db: AsyncSession
-) -> schemas.Success:
-    stmt = insert(models.ExplanationImage).values(problem_id=problem_id, image_url=image_url)
-    await db.execute(stmt)
+async def create_explanation_images(
+        problem_id: int, image_urls: list[str], db: AsyncSession
+) -> list[int]:
+    stmt = (
+        insert(models.ExplanationImage)
+        .values([{"problem_id": problem_id, "image_url": url} for url in image_urls])
+        .returning(models.ExplanationImage.id)
+    )
+    result = await db.execute(stmt)
+    image_ids = list(result.scalars().all())
     await db.commit()
-    return schemas.Success()
+    return image_ids
 
 
 async def delete_problem(
@@ -208,15 +424,20 @@ async def delete_problem(
     problem = await get_problem_by_id(db=db, problem_id=problem_id)
     if not user.is_superuser and not problem.created_by == user:
         raise HTTPException(403, "You do not have permission to do this")
+    theme_id = problem.theme_id
     await db.delete(problem)
+    await touch_theme(db=db, theme_id=theme_id)
     await db.commit()
+    await invalidate_problem(problem_id, theme_id=theme_id)
     return schemas.Success()
 
 
 async def delete_all_problems(db: AsyncSession):
     stmt = delete(models.Problem)
     await db.execute(stmt)
+    await db.execute(update(models.Theme).values(updated_at=func.now()))
     await db.commit()
+    await cache.backend.clear()
 
 
 async def create_comment(
@@ -232,22 +453,66 @@ async def create_comment(
         body=body
     )
     await db.execute(stmt)
+    await db.execute(update(models.Problem).filter_by(id=problem_id).values(updated_at=func.now()))
     await db.commit()
-    await db.refresh(problem)
+    await cache.invalidate(f"problems:{problem_id}")
     return schemas.Success()
 
 
-async def get_all_comments(problem_id: int, db: AsyncSession) -> list[schemas.Comment]:
+COMMENT_ORDERINGS = {
+    enums.CommentOrdering.NEWEST: (models.Comment.created_at, models.Comment.id),
+    enums.CommentOrdering.TOP: (models.Comment.likes, models.Comment.id),
+}
+
+
+def get_comment_cursor_key(comment: models.Comment, ordering: enums.CommentOrdering) -> tuple:
+    return tuple(getattr(comment, column.key) for column in COMMENT_ORDERINGS[ordering])
+
+
+def select_comments(
+        problem_id: int,
+        limit: int = 50,
+        cursor: str | None = None,
+        ordering: enums.CommentOrdering = enums.CommentOrdering.NEWEST,
+):
+    responses_num = (
+        select(func.count(models.CommentResponse.id))
+        .where(models.CommentResponse.comment_id == models.Comment.id)
+        .correlate(models.Comment)
+        .scalar_subquery()
+    )
+    columns = COMMENT_ORDERINGS[ordering]
     stmt = (
-        select(models.Comment)
-        .options(selectinload(models.Comment.responses))
-        .options(joinedload(models.Comment.problem))
+        select(models.Comment, responses_num)
         .options(joinedload(models.Comment.created_by))
         .filter_by(problem_id=problem_id)
-        .order_by(models.Comment.created_at.desc())
+        .order_by(*(column.desc() for column in columns))
+        .limit(limit)
     )
+    if cursor is not None:
+        last_value, last_id = pagination.decode_cursor(cursor, size=2)
+        if ordering == enums.CommentOrdering.NEWEST:
+            last_value = pagination.parse_datetime(last_value)
+        else:
+            last_value = pagination.parse_id(last_value)
+        stmt = stmt.where(tuple_(*columns) < (last_value, pagination.parse_id(last_id)))
+    return stmt
+
+
+async def get_all_comments(
+        problem_id: int,
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: str | None = None,
+        ordering: enums.CommentOrdering = enums.CommentOrdering.NEWEST,
+) -> list[schemas.CommentList]:
+    stmt = select_comments(problem_id=problem_id, limit=limit, cursor=cursor, ordering=ordering)
     result = await db.execute(stmt)
-    return list(result.unique().scalars().all())
+    comments = []
+    for comment, comment_responses_num in result.all():
+        comment.responses_num = comment_responses_num
+        comments.append(comment)
+    return comments
 
 
 async def get_comment_by_id(comment_id: int, db: AsyncSession) -> models.Comment | None:
@@ -262,129 +527,103 @@ async def get_comment_by_id(comment_id: int, db: AsyncSession) -> models.Comment
     return result.unique().scalars().one_or_none()
 
 
-async def get_comment_reaction(
-        user_id: int,
-        comment_id: int,
-        belongs_to: enums.ReactionOwner,
-        db: AsyncSession
-) -> models.CommentReaction | None:
-        stmt = (
-            select(models.CommentReaction)
-            .filter_by(
-                user_id=user_id,
-                comment_id=comment_id,
-                belongs_to=belongs_to
-            )
-        )
-        result = await db.execute(stmt)
-        return result.unique().scalars().one_or_none()
+REACTION_TARGETS = {
+    enums.ReactionOwner.COMMENT: models.Comment,
+    enums.ReactionOwner.RESPONSE: models.CommentResponse,
+    enums.ReactionOwner.QUESTION_RESPONSE: models.QuestionResponse,
+}
+
+REACTION_COUNTERS = {
+    enums.ReactionType.LIKE: "likes",
+    enums.ReactionType.DISLIKE: "dislikes",
+}
 
 
-async def create_comment_reaction(
+async def upsert_comment_reaction(
         user_id: int,
         comment_id: int,
         type: enums.ReactionType,
         belongs_to: enums.ReactionOwner,
         db: AsyncSession
-) -> None:
-    stmt = (
-        insert(models.CommentReaction)
-        .values(
-            user_id=user_id,
-            comment_id=comment_id,
-            type=type,
-            belongs_to=belongs_to
-        )
+) -> enums.ReactionType | None:
+    """Stores the user's reaction in one statement and returns the one it replaced."""
+    stmt = pg_insert(models.CommentReaction).values(
+        user_id=user_id,
+        comment_id=comment_id,
+        type=type,
+        belongs_to=belongs_to
     )
-    await db.execute(stmt)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_comment_reaction_user_comment_owner",
+        set_={"type": stmt.excluded.type},
+        where=models.CommentReaction.type != stmt.excluded.type
+    ).returning(literal_column("xmax = 0").label("inserted"))
+    result = await db.execute(stmt)
+    row = result.first()
+    if row is None:
+        # Conflict without an update: the user had already reacted the same way
+        return type
+    if row.inserted:
+        return None
+    return next(other for other in enums.ReactionType if other != type)
 
 
-async def like_comment(
+async def react_to_comment(
         comment: models.Comment,
         comment_type: enums.ReactionOwner,
+        reaction_type: enums.ReactionType,
         user: auth_models.User,
         db: AsyncSession
 ) -> None:
-    comment_reaction = await get_comment_reaction(
+    previous_type = await upsert_comment_reaction(
         user_id=user.id,
         comment_id=comment.id,
+        type=reaction_type,
         belongs_to=comment_type,
         db=db
     )
-    if not comment_reaction:
-        await create_comment_reaction(
-            user_id=user.id,
-            comment_id=comment.id,
-            type=enums.ReactionType.LIKE,
-            belongs_to=comment_type,
-            db=db
-        )
-        comment.likes += 1
+    if previous_type == reaction_type:
         await db.commit()
-        await db.refresh(comment)
-        return
-
-    if comment_reaction.type == enums.ReactionType.LIKE:
         return
 
-    if comment_reaction.type == enums.ReactionType.DISLIKE:
-        await db.delete(comment_reaction)
-        await create_comment_reaction(
-            comment_id=comment.id,
-            user_id=user.id,
-            type=enums.ReactionType.LIKE,
-            belongs_to=comment_type,
-            db=db
-        )
-        comment.dislikes -= 1
-        comment.likes += 1
-        await db.commit()
-        await db.refresh(comment)
+    model = REACTION_TARGETS[comment_type]
+    counter = REACTION_COUNTERS[reaction_type]
+    values = {counter: getattr(model, counter) + 1}
+    if previous_type is not None:
+        previous_counter = REACTION_COUNTERS[previous_type]
+        values[previous_counter] = getattr(model, previous_counter) - 1
+    await db.execute(update(model).filter_by(id=comment.id).values(**values))
+    await db.commit()
 
 
-async def dislike_comment(
+async def like_comment(
         comment: models.Comment,
         comment_type: enums.ReactionOwner,
         user: auth_models.User,
         db: AsyncSession
 ) -> None:
-    comment_reaction = await get_comment_reaction(
-        user_id=user.id,
-        comment_id=comment.id,
-        belongs_to=comment_type,
+    await react_to_comment(
+        comment=comment,
+        comment_type=comment_type,
+        reaction_type=enums.ReactionType.LIKE,
+        user=user,
         db=db
     )
 
-    if not comment_reaction:
-        await create_comment_reaction(
-            user_id=user.id,
-            comment_id=comment.id,
-            type=enums.ReactionType.DISLIKE,
-            belongs_to=comment_type,
-            db=db
-        )
-        comment.dislikes += 1
-        await db.commit()
-        await db.refresh(comment)
-        return
-
-    if comment_reaction.type == enums.ReactionType.DISLIKE:
-        return
 
-    if comment_reaction.type == enums.ReactionType.LIKE:
-        await db.delete(comment_reaction)
-        await create_comment_reaction(
-            user_id=user.id,
-            comment_id=comment.id,
-            type=enums.ReactionType.DISLIKE,
-            belongs_to=comment_type,
-            db=db
-        )
-        comment.likes -= 1
-        comment.dislikes += 1
-        await db.commit()
-        await db.refresh(comment)
-        return
+async def dislike_comment(
+        comment: models.Comment,
+        comment_type: enums.ReactionOwner,
+        user: auth_models.User,
+        db: AsyncSession
+) -> None:
+    await react_to_comment(
+        comment=comment,
+        comment_type=comment_type,
+        reaction_type=enums.ReactionType.DISLIKE,
+        user=user,
+        db=db
+    )
 
 
 async def create_comment_response(
@@ -437,36 +676,73 @@ async def create_question(
         .values(**question_schema.model_dump(), author_id=author_id)
     )
     await db.execute(stmt)
+    await touch_theme(db=db, theme_id=question_schema.theme_id)
     await db.commit()
+    await cache.invalidate("themes:all", f"themes:{question_schema.theme_id}")
     return schemas.Success()
 
 
-async def get_all_questions(
+def select_questions(
         offset: int,
         limit: int,
         theme_id: int | None,
         keywords: str | None,
-        db: AsyncSession
-) -> list[schemas.QuestionList]:
+        cursor: str | None = None,
+        trigram_indexes: set[str] = frozenset(),
+):
     stmt = (
-        select(models.Question)
-        .options(joinedload(models.Question.created_by))
-        .options(joinedload(models.Question.theme))
-        .options(selectinload(models.Question.responses))
-        .offset(offset)
+        select(
+            models.Question.id,
+            models.Question.title,
+            models.Question.description,
+            models.Question.created_at,
+            models.Theme.id,
+            models.Theme.name,
+        )
+        .join(models.Question.theme)
         .limit(limit)
-        .order_by(models.Question.created_at.desc())
     )
+    if cursor is not None:
+        if keywords:
+            raise HTTPException(400, "Cursor can't be combined with keywords, use offset")
+        last_created_at, last_id = pagination.decode_cursor(cursor, size=2)
+        stmt = stmt.where(
+            tuple_(models.Question.created_at, models.Question.id)
+            < (pagination.parse_datetime(last_created_at), pagination.parse_id(last_id))
+        )
+    else:
+        stmt = stmt.offset(offset)
     if theme_id is not None:
-        stmt = stmt.filter_by(theme_id=theme_id)
-    if keywords is not None:
-        keywords_ls = keywords.split(" ")
-        clauses = [models.Question.description.icontains(keyword) for keyword in keywords_ls]
-        clauses.extend(models.Question.title.icontains(keyword) for keyword in keywords_ls)
-        stmt = stmt.where(or_(*clauses))
+        stmt = stmt.where(models.Question.theme_id == theme_id)
+    if keywords:
+        condition, rank = keyword_search(
+            keywords,
+            models.Question.title,
+            models.Question.description,
+            trigram_indexes=trigram_indexes
+        )
+        stmt = stmt.where(condition).order_by(rank.desc())
+    return stmt.order_by(models.Question.created_at.desc(), models.Question.id.desc())
+
+
+async def get_all_questions(
+        offset: int,
+        limit: int,
+        theme_id: int | None,
+        keywords: str | None,
+        db: AsyncSession,
+        cursor: str | None = None,
+) -> list[schemas.QuestionList]:
+    stmt = select_questions(
+        offset=offset,
+        limit=limit,
+        theme_id=theme_id,
+        keywords=keywords,
+        cursor=cursor,
+        trigram_indexes=await get_trigram_indexes(db) if keywords else frozenset(),
+    )
     result = await db.execute(stmt)
-    questions = result.unique().scalars().all()
-    return list(questions)
+    return [dto.question_from_row(row) for row in result]
 
 
 async def get_question_by_id(question_id: int, db: AsyncSession) -> schemas.Question:
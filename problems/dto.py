@@ -0,0 +1,92 @@
+"""
+Plain row objects for the list endpoints. They are built straight from the
+selected columns, so nothing is hydrated into the session's identity map;
+pydantic reads them the same way it reads ORM entities (from_attributes).
+"""
+import datetime
+from dataclasses import dataclass
+
+from sqlalchemy import Row
+
+from enums import DifficultyLevel
+
+
+@dataclass(slots=True)
+class UserShort:
+    id: int
+    username: str
+    email: str
+
+
+@dataclass(slots=True)
+class ThemeShort:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class ThemeRow:
+    id: int
+    name: str
+    description: str
+    problems_num: int
+    questions_num: int
+
+
+@dataclass(slots=True)
+class ProblemRow:
+    id: int
+    theme: ThemeShort | None
+    name: str
+    difficulty_level: DifficultyLevel
+    description: str
+    created_by: UserShort | None
+    completions: int
+
+
+@dataclass(slots=True)
+class QuestionRow:
+    id: int
+    title: str
+    description: str
+    theme: ThemeShort
+    created_at: datetime.datetime
+
+
+def theme_short(theme_id: int | None, name: str | None) -> ThemeShort | None:
+    return ThemeShort(theme_id, name) if theme_id is not None else None
+
+
+def user_short(user_id: int | None, username: str | None, email: str | None) -> UserShort | None:
+    return UserShort(user_id, username, email) if user_id is not None else None
+
+
+def theme_from_row(row: Row) -> ThemeRow:
+    return ThemeRow(*row)
+
+
+def problem_from_row(row: Row) -> ProblemRow:
+    (
+        problem_id, name, difficulty_level, description, completions,
+        theme_id, theme_name, author_id, username, email
+    ) = row
+    return ProblemRow(
+        id=problem_id,
+        theme=theme_short(theme_id, theme_name),
+        name=name,
+        difficulty_level=difficulty_level,
+        description=description,
+        created_by=user_short(author_id, username, email),
+        completions=completions,
+    )
+
+
+def question_from_row(row: Row) -> QuestionRow:
+    question_id, title, description, created_at, theme_id, theme_name = row
+    return QuestionRow(
+        id=question_id,
+        title=title,
+        description=description,
+        theme=theme_short(theme_id, theme_name),
+        created_at=created_at,
+    )
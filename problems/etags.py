@@ -0,0 +1,40 @@
+import hashlib
+
+from fastapi import Request, Response
+
+import settings
+
+
+def make_etag(*parts) -> str:
+    """Strong validator built from the row versions a representation depends on."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def get_cache_control() -> str:
+    return (
+        f"public, max-age={settings.CATALOGUE_MAX_AGE_SEC}, "
+        f"stale-while-revalidate={settings.CATALOGUE_STALE_WHILE_REVALIDATE_SEC}"
+    )
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates
+
+
+def set_headers(response: Response, etag: str | None = None) -> None:
+    response.headers["Cache-Control"] = get_cache_control()
+    if etag is not None:
+        response.headers["ETag"] = etag
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_headers(response, etag)
+    return response
@@ -0,0 +1,200 @@
+import asyncio
+import datetime
+import logging
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+import enums
+import settings
+from auth import models as auth_models, schemas as auth_schemas
+from problems import models
+
+
+logger = logging.getLogger(__name__)
+
+PROBLEM_SCORES = {
+    enums.DifficultyLevel.EASY: 5,
+    enums.DifficultyLevel.MEDIUM: 10,
+    enums.DifficultyLevel.HARD: 20,
+}
+
+
+class Ranking:
+    """
+    Scores sorted best first, so finding a user's rank is a binary search,
+    O(log n). Changing a score moves the entry within the list, which is O(n).
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[int, int]] = []
+        self._scores: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set_score(self, user_id: int, score: int) -> None:
+        old_score = self._scores.pop(user_id, None)
+        if old_score is not None:
+            del self._entries[bisect_left(self._entries, (-old_score, user_id))]
+        if score > 0:
+            self._scores[user_id] = score
+            insort(self._entries, (-score, user_id))
+
+    def add_points(self, user_id: int, points: int) -> None:
+        self.set_score(user_id, self._scores.get(user_id, 0) + points)
+
+    def get_score(self, user_id: int) -> int | None:
+        return self._scores.get(user_id)
+
+    def get_rank(self, user_id: int) -> int | None:
+        """Users with equal scores share a rank."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self._entries, (-score,)) + 1
+
+    def get_top(self, limit: int) -> list[tuple[int, int, int]]:
+        top = []
+        for index, (negative_score, user_id) in enumerate(self._entries[:limit]):
+            if index and negative_score == self._entries[index - 1][0]:
+                rank = top[-1][0]
+            else:
+                rank = index + 1
+            top.append((rank, user_id, -negative_score))
+        return top
+
+
+class Leaderboard:
+    """
+    In-process copies of user.score and theme_score, both maintained by
+    crud.record_solve. build() loads them once, from the lifespan handler;
+    refresh() then applies only the scores whose timestamp moved since the
+    previous load, so solves recorded by other workers show up within
+    LEADERBOARD_REFRESH_SEC. Solves handled by this worker apply in place.
+    """
+
+    def __init__(self):
+        self.overall = Ranking()
+        self.themes: dict[int, Ranking] = defaultdict(Ranking)
+        self.synced_at: datetime.datetime | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self.synced_at is not None
+
+    async def build(self, db: AsyncSession) -> None:
+        async with self._lock:
+            if self.is_built:
+                return
+            synced_at = await db.scalar(select(func.localtimestamp()))
+            overall = Ranking()
+            result = await db.execute(
+                select(auth_models.User.id, auth_models.User.score)
+                .where(auth_models.User.score > 0)
+            )
+            for user_id, score in result.all():
+                overall.set_score(user_id, score)
+
+            themes = defaultdict(Ranking)
+            result = await db.execute(
+                select(models.ThemeScore.theme_id, models.ThemeScore.user_id, models.ThemeScore.score)
+                .where(models.ThemeScore.score > 0)
+            )
+            for theme_id, user_id, score in result.all():
+                themes[theme_id].set_score(user_id, score)
+
+            self.overall, self.themes = overall, themes
+            self.synced_at = synced_at
+
+    async def refresh(self, db: AsyncSession) -> None:
+        if not self.is_built:
+            await self.build(db)
+            return
+        async with self._lock:
+            # Timestamps are the start of the writing transaction, which may commit
+            # after this read; going back one more period picks such rows up.
+            # Scores are absolute, so applying a row twice changes nothing.
+            synced_at = await db.scalar(select(func.localtimestamp()))
+            since = self.synced_at - datetime.timedelta(seconds=settings.LEADERBOARD_REFRESH_SEC)
+            users = (await db.execute(
+                select(auth_models.User.id, auth_models.User.score)
+                .where(auth_models.User.score_updated_at >= since)
+            )).all()
+            theme_scores = (await db.execute(
+                select(models.ThemeScore.theme_id, models.ThemeScore.user_id, models.ThemeScore.score)
+                .where(models.ThemeScore.updated_at >= since)
+            )).all()
+
+            for user_id, score in users:
+                self.overall.set_score(user_id, score)
+            for theme_id, user_id, score in theme_scores:
+                self.themes[theme_id].set_score(user_id, score)
+            self.synced_at = synced_at
+
+    def record_solve(self, user_id: int, theme_id: int | None, points: int) -> None:
+        if not self.is_built:
+            return
+        self.overall.add_points(user_id, points)
+        if theme_id is not None:
+            self.themes[theme_id].add_points(user_id, points)
+
+    def get_ranking(self, theme_id: int | None) -> Ranking:
+        if theme_id is None:
+            return self.overall
+        return self.themes.get(theme_id, Ranking())
+
+
+leaderboard = Leaderboard()
+
+
+async def keep_refreshed(interval_sec: float) -> None:
+    """Runs for the lifetime of the app, so no request ever waits on a reload."""
+    while True:
+        await asyncio.sleep(interval_sec)
+        try:
+            async with database.get_sessionmaker()() as db:
+                await leaderboard.refresh(db)
+        except Exception:
+            logger.exception("leaderboard refresh failed")
+
+
+async def get_leaderboard(
+        db: AsyncSession,
+        theme_id: int | None,
+        limit: int,
+        user_id: int | None = None
+) -> auth_schemas.Leaderboard:
+    if not leaderboard.is_built:
+        await leaderboard.build(db)
+    ranking = leaderboard.get_ranking(theme_id)
+
+    rows = ranking.get_top(limit)
+    if user_id is not None and ranking.get_rank(user_id) is not None:
+        me = (ranking.get_rank(user_id), user_id, ranking.get_score(user_id))
+    else:
+        me = None
+
+    user_ids = {row[1] for row in rows}
+    if me:
+        user_ids.add(user_id)
+    result = await db.execute(
+        select(auth_models.User.id, auth_models.User.username)
+        .where(auth_models.User.id.in_(user_ids))
+    )
+    usernames = dict(result.all())
+
+    def to_entry(row: tuple[int, int, int]) -> auth_schemas.LeaderboardEntry:
+        rank, entry_user_id, score = row
+        return auth_schemas.LeaderboardEntry(
+            rank=rank, id=entry_user_id, username=usernames.get(entry_user_id, ""), score=score
+        )
+
+    return auth_schemas.Leaderboard(
+        top=[to_entry(row) for row in rows],
+        me=to_entry(me) if me else None
+    )
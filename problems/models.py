@@ -1,7 +1,7 @@
 import datetime
 from typing import Annotated
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, func, literal_column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 import enums
@@ -10,6 +10,17 @@ from database import Base
 
 
 intpk = Annotated[int, mapped_column(primary_key=True)]
+updated_at = Annotated[
+    datetime.datetime,
+    mapped_column(server_default=func.now(), onupdate=func.now())
+]
+
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def to_tsvector(document):
+    """Must stay in sync with the expression of the full-text indexes below."""
+    return func.to_tsvector(SEARCH_CONFIG, document)
 
 
 class Theme(Base):
@@ -18,9 +29,16 @@ class Theme(Base):
     id: Mapped[intpk]
     name: Mapped[str] = mapped_column(unique=True)
     description: Mapped[str] = mapped_column(nullable=False)
+    updated_at: Mapped[updated_at]
 
-    problems: Mapped[list["Problem"]] = relationship(back_populates="theme")
-    questions: Mapped[list["Question"]] = relationship(back_populates="theme")
+    problems: Mapped[list["Problem"]] = relationship(
+        back_populates="theme",
+        passive_deletes=True
+    )
+    questions: Mapped[list["Question"]] = relationship(
+        back_populates="theme",
+        passive_deletes=True
+    )
 
     repr_cols = ("id", "name")
 
@@ -36,14 +54,27 @@ class Question(Base):
         ForeignKey("theme.id", ondelete="CASCADE")
     )
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE")
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
-    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow())
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
 
     theme: Mapped["Theme"] = relationship(back_populates="questions")
     created_by: Mapped["User"] = relationship(back_populates="questions")
     responses: Mapped[list["QuestionResponse"]] = relationship(back_populates="question")
 
+    __table_args__ = (
+        Index("ix_question_created_at_id", "created_at", "id"),
+        Index("ix_question_theme_id_created_at_id", "theme_id", "created_at", "id"),
+        Index(
+            "ix_question_fts",
+            # written the way Postgres normalizes it, so autogenerate sees no change
+            to_tsvector(literal_column("(title::text || ' '::text) || description::text")),
+            postgresql_using="gin"
+        ),
+        # trigram indexes on title and description only exist where pg_trgm is
+        # available, so migration 80f372e374b6 owns them (see alembic/env.py)
+    )
+
     repr_cols = ("id", "title", "created_at")
 
 
@@ -54,9 +85,11 @@ class QuestionResponse(Base):
     body: Mapped[str]
     likes: Mapped[int] = mapped_column(default=0)
     dislikes: Mapped[int] = mapped_column(default=0)
-    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow())
-    author_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
-    question_id: Mapped[int] = mapped_column(ForeignKey("question.id", ondelete="CASCADE"))
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
+    author_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    question_id: Mapped[int] = mapped_column(
+        ForeignKey("question.id", ondelete="CASCADE"), index=True
+    )
 
     created_by: Mapped["User"] = relationship(back_populates="question_responses")
     question: Mapped["Question"] = relationship(back_populates="responses")
@@ -73,12 +106,14 @@ class Problem(Base):
     description: Mapped[str]
     answer: Mapped[str]
     explanation: Mapped[str]
+    completions: Mapped[int] = mapped_column(default=0, server_default="0")
+    updated_at: Mapped[updated_at]
     theme_id: Mapped[int | None] = mapped_column(
         ForeignKey("theme.id", ondelete="SET NULL"),
         nullable=True
     )
     author_id: Mapped[int | None] = mapped_column(
-        ForeignKey("user.id", ondelete="SET NULL")
+        ForeignKey("user.id", ondelete="SET NULL"), index=True
     )
 
     theme: Mapped["Theme"] = relationship(back_populates="problems")
@@ -91,7 +126,19 @@ class Problem(Base):
         back_populates="completed_problems",
         secondary="problem_user"
     )
-    comments: Mapped["Comment"] = relationship(back_populates="problem")
+    comments: Mapped[list["Comment"]] = relationship(
+        back_populates="problem", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index("ix_problem_theme_id_id", "theme_id", "id"),
+        Index(
+            "ix_problem_description_fts",
+            to_tsvector(literal_column("description")),
+            postgresql_using="gin"
+        ),
+        # plus the optional trigram index on description, see Question
+    )
 
     repr_cols = ("id", "name", "difficulty_level")
 
@@ -103,7 +150,8 @@ class ExplanationImage(Base):
     image_url: Mapped[str]
     problem_id: Mapped[int | None] = mapped_column(
         ForeignKey("problem.id", ondelete="SET NULL"),
-        nullable=True
+        nullable=True,
+        index=True
     )
 
     problem: Mapped["Problem"] = relationship(back_populates="images")
@@ -120,8 +168,33 @@ class DoneProblem(Base):
     )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )
+
+
+class ThemeScore(Base):
+    """Points a user earned on the problems of one theme, kept up by crud.record_solve."""
+
+    __tablename__ = "theme_score"
+
+    theme_id: Mapped[int] = mapped_column(
+        ForeignKey("theme.id", ondelete="CASCADE"),
         primary_key=True
     )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True
+    )
+    score: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[updated_at]
+
+    __table_args__ = (
+        Index("ix_theme_score_updated_at", "updated_at"),
+    )
+
+    repr_cols = ("theme_id", "user_id", "score")
 
 
 class Comment(Base):
@@ -133,17 +206,22 @@ class Comment(Base):
     likes: Mapped[int] = mapped_column(default=0)
     dislikes: Mapped[int] = mapped_column(default=0)
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE")
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
     problem_id: Mapped[int] = mapped_column(
         ForeignKey("problem.id", ondelete="CASCADE")
     )
-    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow())
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
 
     created_by: Mapped["User"] = relationship(back_populates="comments")
     problem: Mapped["Problem"] = relationship(back_populates="comments")
     responses: Mapped[list["CommentResponse"]] = relationship(back_populates="comment")
 
+    __table_args__ = (
+        Index("ix_comment_problem_id_created_at_id", "problem_id", "created_at", "id"),
+        Index("ix_comment_problem_id_likes_id", "problem_id", "likes", "id"),
+    )
+
     repr_cols = ("id", "created_at")
 
 
@@ -156,6 +234,15 @@ class CommentReaction(Base):
     type: Mapped[enums.ReactionType]
     belongs_to: Mapped[enums.ReactionOwner] = mapped_column(nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "comment_id",
+            "belongs_to",
+            name="uq_comment_reaction_user_comment_owner"
+        ),
+    )
+
     repr_cols = ("id", "type")
 
 
@@ -164,13 +251,13 @@ class CommentResponse(Base):
 
     id: Mapped[intpk]
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("user.id", ondelete="CASCADE")
+        ForeignKey("user.id", ondelete="CASCADE"), index=True
     )
     comment_id: Mapped[int] = mapped_column(
-        ForeignKey("comment.id", ondelete="CASCADE")
+        ForeignKey("comment.id", ondelete="CASCADE"), index=True
     )
     body: Mapped[str]
-    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow())
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
 
     created_by: Mapped["User"] = relationship(back_populates="comment_responses")
     comment: Mapped["Comment"] = relationship(back_populates="responses")
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Response
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [
+        value.isoformat() if isinstance(value, datetime.datetime) else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(400, "Invalid cursor")
+    return values
+
+
+def parse_id(value: Any) -> int:
+    # bool is an int subclass, but true/false in a cursor is never an id
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise HTTPException(400, "Invalid cursor")
+    return value
+
+
+def parse_datetime(value: Any) -> datetime.datetime:
+    try:
+        value = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+    # timestamps are stored as naive UTC, as the cursors handed out are
+    if value.tzinfo is not None:
+        raise HTTPException(400, "Invalid cursor")
+    return value
+
+
+def set_next_cursor(
+        response: Response,
+        items: Sequence,
+        limit: int,
+        key: Callable[[Any], tuple]
+) -> None:
+    """A full page means there may be more rows, so hand out a cursor after the last one."""
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
@@ -1,10 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, UploadFile, HTTPException, Query
+from fastapi import APIRouter, Depends, UploadFile, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import enums
-from problems import schemas, crud
+import serialization
+from problems import schemas, crud, etags, pagination
 from dependencies import get_db
 from aws import utils
 from auth.crud import get_current_user
@@ -32,13 +33,33 @@ async def create_theme(
 
 
 @router_theme.get("/", response_model=list[schemas.Theme])
-async def read_themes(db: AsyncSession = Depends(get_db)):
-    return await crud.get_all_themes(db=db)
+async def read_themes(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    await crud.read_snapshot(db=db)
+    etag = etags.make_etag("themes", *await crud.get_themes_version(db=db))
+    if etags.is_not_modified(request, etag):
+        return etags.not_modified(etag)
+    etags.set_headers(response, etag)
+    return serialization.schema_response(await crud.get_all_themes(db=db, version=etag), response)
 
 
 @router_theme.get("/{theme_id}/", response_model=schemas.Theme)
-async def read_one_theme(theme_id: int, db: AsyncSession = Depends(get_db)):
-    return await crud.get_theme_by_id(db=db, theme_id=theme_id)
+async def read_one_theme(
+        theme_id: int,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db)
+):
+    await crud.read_snapshot(db=db)
+    version = await crud.get_theme_version(db=db, theme_id=theme_id)
+    etag = None
+    if version:
+        etag = etags.make_etag("theme", *version)
+        if etags.is_not_modified(request, etag):
+            return etags.not_modified(etag)
+        etags.set_headers(response, etag)
+    return serialization.schema_response(
+        await crud.get_theme_by_id(db=db, theme_id=theme_id, version=etag), response
+    )
 
 
 @router_theme.put("/{theme_id}/", response_model=schemas.Theme)
@@ -78,19 +99,44 @@ async def create_problem(
 
 
 @router_problem.get("/{problem_id}/", response_model=schemas.Problem)
-async def read_one_problem(problem_id: int, db: AsyncSession = Depends(get_db)):
-    return await crud.get_problem_by_id(db=db, problem_id=problem_id)
+async def read_one_problem(
+        problem_id: int,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db)
+):
+    await crud.read_snapshot(db=db)
+    version = await crud.get_problem_version(db=db, problem_id=problem_id)
+    etag = None
+    if version:
+        etag = etags.make_etag("problem", *version)
+        if etags.is_not_modified(request, etag):
+            return etags.not_modified(etag)
+        etags.set_headers(response, etag)
+    return serialization.schema_response(
+        await crud.get_problem(db=db, problem_id=problem_id, version=etag), response
+    )
 
 
 @router_problem.get("/", response_model=list[schemas.ProblemList])
 async def read_problems(
+        response: Response,
         theme_id: int = None,
         offset: int = Query(0, ge=0),
         limit: int = Query(100, ge=0),
         keywords: str = None,
+        cursor: str = None,
         db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_all_problems(offset=offset, limit=limit, theme_id=theme_id, keywords=keywords, db=db)
+    problems = await crud.get_all_problems(
+        offset=offset, limit=limit, theme_id=theme_id, keywords=keywords, cursor=cursor, db=db
+    )
+    if not keywords:
+        pagination.set_next_cursor(
+            response, problems, limit, key=lambda problem: (problem.id,)
+        )
+    etags.set_headers(response)
+    return serialization.schema_response(problems, response)
 
 
 @router_problem.post("/{problem_id}/submit/", response_model=schemas.Success)
@@ -123,12 +169,14 @@ async def upload_explanation_images(
     if not user == problem.created_by:
         raise HTTPException(403, "You cannot do this, I'm sorry")
 
-    directory = "explanations"
-    for image in images:
-        image_url = await utils.upload_image(file=image, directory=directory)
-        await crud.create_explanation_image(
-            problem_id=problem_id, image_url=image_url, db=db
+    image_urls = await utils.upload_images(files=images, directory="explanations")
+    try:
+        await crud.create_explanation_images(
+            problem_id=problem_id, image_urls=image_urls, db=db
         )
+    except Exception:
+        await utils.delete_images(image_urls)
+        raise
     return schemas.Success
 
 
@@ -141,12 +189,12 @@ async def read_problem_explanation(
         db: Annotated[AsyncSession, Depends(get_db)],
         user = Depends(get_current_user)
 ):
-    problem = await crud.get_problem_by_id(problem_id=problem_id, db=db)
     if not user:
         raise HTTPException(401, "Authentication errror")
-    if not user in problem.completed_by:
+    problem = await crud.get_problem_by_id(problem_id=problem_id, db=db)
+    if not await crud.is_problem_completed(db=db, problem_id=problem.id, user_id=user.id):
         raise HTTPException(403, "Complete the problem first")
-    return await crud.get_problem_by_id(db=db, problem_id=problem_id)
+    return problem
 
 
 @router_problem.post("/{problem_id}/comments/", response_model=schemas.Success)
@@ -161,16 +209,31 @@ async def create_comment(
     return await crud.create_comment(problem_id=problem_id, body=body, user=user, db=db)
 
 
-@router_problem.get("/{problem_id}/comments/", response_model=list[schemas.Comment])
+@router_problem.get("/{problem_id}/comments/", response_model=list[schemas.CommentList])
 async def read_comments(
         problem_id: int,
+        response: Response,
+        limit: int = Query(50, ge=1, le=100),
+        cursor: str = None,
+        ordering: enums.CommentOrdering = enums.CommentOrdering.NEWEST,
         user = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
 ):
+    if not user:
+        raise HTTPException(401, "Authentication error")
     problem = await crud.get_problem_by_id(db=db, problem_id=problem_id)
-    if problem not in user.completed_problems:
+    if not await crud.is_problem_completed(db=db, problem_id=problem.id, user_id=user.id):
         raise HTTPException(403, "First complete this problem!")
-    return await crud.get_all_comments(problem_id=problem.id, db=db)
+    comments = await crud.get_all_comments(
+        problem_id=problem.id, limit=limit, cursor=cursor, ordering=ordering, db=db
+    )
+    pagination.set_next_cursor(
+        response,
+        comments,
+        limit,
+        key=lambda comment: crud.get_comment_cursor_key(comment, ordering)
+    )
+    return comments
 
 
 @router_problem.delete("/{problem_id}/", response_model=schemas.Success)
@@ -325,15 +388,22 @@ async def create_question(
 
 @router_question.get("/questions/", response_model=list[schemas.QuestionList])
 async def read_questions(
+        response: Response,
         theme_id: int = None,
         offset: int = Query(0, ge=0),
         limit: int = Query(100, ge=0),
         keywords: str = None,
+        cursor: str = None,
         db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_all_questions(
-        offset=offset, limit=limit, theme_id=theme_id, keywords=keywords, db=db
+    questions = await crud.get_all_questions(
+        offset=offset, limit=limit, theme_id=theme_id, keywords=keywords, cursor=cursor, db=db
     )
+    if not keywords:
+        pagination.set_next_cursor(
+            response, questions, limit, key=lambda question: (question.created_at, question.id)
+        )
+    return questions
 
 
 @router_question.get("/questions/{question_id}/", response_model=schemas.Question)
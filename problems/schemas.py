@@ -111,6 +111,10 @@ class Comment(BaseModel):
         return v.strftime("%Y/%m/%d, %H:%M")
 
 
+class CommentList(Comment):
+    responses_num: int
+
+
 class QuestionBase(BaseModel):
     title: str
     description: str
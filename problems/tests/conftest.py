@@ -1,5 +1,8 @@
 import pytest
+from sqlalchemy import delete, update
 
+from auth.models import User
+from problems.models import ThemeScore
 from problems.crud import create_theme, delete_all_themes, delete_all_problems
 from problems.schemas import ThemeBase
 
@@ -24,3 +27,11 @@ async def delete_themes(session):
 async def delete_problems(session):
     yield
     await delete_all_problems(db=session)
+
+
+@pytest.fixture()
+async def reset_scores(session):
+    yield
+    await session.execute(update(User).values(score=0))
+    await session.execute(delete(ThemeScore))
+    await session.commit()
@@ -0,0 +1,101 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+import cache
+from auth.utils import encode_jwt
+from problems import crud
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request) -> cache.CacheBackend:
+    if request.param == "memory":
+        return cache.MemoryCache(max_entries=10)
+    return cache.RedisCache(FakeAsyncRedis())
+
+
+class TestCacheBackend:
+    @pytest.mark.anyio
+    async def test_get_set_delete(self, backend: cache.CacheBackend):
+        await backend.set("themes:all", b"[]", ttl=60)
+        await backend.set("problems:1", b"{}", ttl=60)
+        await backend.set("problems:list:a", b"[]", ttl=60)
+        await backend.set("problems:list:b", b"[]", ttl=60)
+        assert await backend.get("themes:all") == b"[]"
+
+        await backend.delete("themes:all")
+        assert await backend.get("themes:all") is None
+
+        await backend.delete_prefix("problems:list:")
+        assert await backend.get("problems:list:a") is None
+        assert await backend.get("problems:list:b") is None
+        assert await backend.get("problems:1") == b"{}"
+
+    @pytest.mark.anyio
+    async def test_generation_bump_invalidates_without_walking_keys(
+        self, backend: cache.CacheBackend, monkeypatch
+    ):
+        async def fail(prefix: str) -> None:
+            raise AssertionError("walked the keys")
+
+        monkeypatch.setattr(cache, "backend", backend)
+        monkeypatch.setattr(backend, "delete_prefix", fail)
+        calls = []
+
+        @cache.cached("pages:{page}", list[int], generation="pages")
+        async def read_page(page: int) -> list[int]:
+            calls.append(page)
+            return [page]
+
+        assert await read_page(1) == await read_page(1) == [1]
+        assert calls == [1]
+        await cache.invalidate(generations=("pages",))
+        assert await read_page(1) == [1]
+        assert calls == [1, 1]
+
+    def test_backend_must_implement_every_method(self):
+        class GetOnly(cache.CacheBackend):
+            async def get(self, key: str) -> bytes | None:
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+    @pytest.mark.anyio
+    async def test_memory_cache_evicts_least_recently_used(self):
+        backend = cache.MemoryCache(max_entries=2)
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        await backend.get("a")
+        await backend.set("c", b"3", ttl=60)
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+
+    @pytest.mark.anyio
+    async def test_memory_cache_expires(self):
+        backend = cache.MemoryCache(max_entries=2)
+        await backend.set("a", b"1", ttl=-1)
+        assert await backend.get("a") is None
+
+
+class TestCachedCrud:
+    @pytest.mark.anyio
+    async def test_theme_is_cached_until_updated(self, client: AsyncClient, session):
+        themes = await crud.get_all_themes(db=session)
+        theme = themes[-1]
+        url = f"/themes/{theme.id}/"
+
+        await client.get(url)
+        hits = REGISTRY.get_sample_value("cache_requests_total", {"result": "hit"}) or 0
+        response = await client.get(url)
+        assert REGISTRY.get_sample_value("cache_requests_total", {"result": "hit"}) == hits + 1
+        assert response.json().get("name") == theme.name
+
+        token = encode_jwt({"sub": 2})
+        json = {"name": "Cached theme", "description": theme.description}
+        await client.put(url, json=json, headers={"Authorization": f"Bearer {token}"})
+        response = await client.get(url)
+        assert response.json().get("name") == "Cached theme"
+        response = await client.get("/themes/")
+        assert "Cached theme" in [theme["name"] for theme in response.json()]
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, delete, func
+
+import enums
+from auth import crud as auth_crud
+from database import SessionLocal
+from enums import DifficultyLevel
+from problems import crud, models, pagination
+from problems.schemas import ProblemCreate
+
+
+@pytest.fixture(scope="module")
+async def comment_id(session) -> int:
+    admin = await auth_crud.get_principal(db=session, user_id=2)
+    themes = await crud.get_all_themes(db=session)
+    await crud.create_problem(
+        db=session,
+        problem_schema=ProblemCreate(
+            name="commented_problem",
+            difficulty_level=DifficultyLevel.EASY,
+            description="Something to talk about",
+            theme_id=themes[0].id,
+            answer="42",
+            explanation="Because"
+        ),
+        author=admin
+    )
+    problem_id = await session.scalar(
+        select(models.Problem.id).filter_by(name="commented_problem")
+    )
+    await crud.create_comment(problem_id=problem_id, user=admin, body="Hi", db=session)
+    yield await session.scalar(select(models.Comment.id).filter_by(problem_id=problem_id))
+    await session.execute(delete(models.Problem).filter_by(id=problem_id))
+    await session.commit()
+    await crud.invalidate_problem(problem_id, theme_id=themes[0].id)
+
+
+async def get_reactions(comment_id: int) -> tuple[int, int]:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(models.Comment.likes, models.Comment.dislikes).filter_by(id=comment_id)
+        )
+        return tuple(result.one())
+
+
+async def react(comment_id: int, user_id: int, reaction: str) -> None:
+    async with SessionLocal() as db:
+        comment = await crud.get_comment_by_id(comment_id=comment_id, db=db)
+        user = await auth_crud.get_principal(db=db, user_id=user_id)
+        method = crud.like_comment if reaction == "like" else crud.dislike_comment
+        await method(
+            comment=comment, comment_type=enums.ReactionOwner.COMMENT, user=user, db=db
+        )
+
+
+class TestComment:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "reaction, likes, dislikes",
+        [
+            ("like", 1, 0),
+            ("like", 1, 0),
+            ("dislike", 0, 1),
+            ("dislike", 0, 1),
+            ("like", 1, 0),
+        ]
+    )
+    async def test_toggle_reaction(
+        self, comment_id: int, reaction: str, likes: int, dislikes: int
+    ):
+        await react(comment_id=comment_id, user_id=1, reaction=reaction)
+        assert await get_reactions(comment_id) == (likes, dislikes)
+
+    @pytest.mark.anyio
+    async def test_concurrent_reactions(self, comment_id: int):
+        likes, dislikes = await get_reactions(comment_id)
+        await asyncio.gather(
+            *(react(comment_id=comment_id, user_id=2, reaction="like") for _ in range(5))
+        )
+        assert await get_reactions(comment_id) == (likes + 1, dislikes)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("ordering", list(enums.CommentOrdering))
+    async def test_read_comments_pages(
+        self, comment_id: int, session, ordering: enums.CommentOrdering
+    ):
+        problem_id = await session.scalar(select(models.Comment.problem_id).filter_by(id=comment_id))
+        admin = await auth_crud.get_principal(db=session, user_id=2)
+        while await session.scalar(select(func.count()).filter(models.Comment.problem_id == problem_id)) < 3:
+            await crud.create_comment(problem_id=problem_id, user=admin, body="More", db=session)
+
+        seen, cursor = [], None
+        while True:
+            comments = await crud.get_all_comments(
+                problem_id=problem_id, limit=2, cursor=cursor, ordering=ordering, db=session
+            )
+            seen.extend(comment.id for comment in comments)
+            assert all(comment.responses_num == 0 for comment in comments)
+            if len(comments) < 2:
+                break
+            cursor = pagination.encode_cursor(*crud.get_comment_cursor_key(comments[-1], ordering))
+        assert len(seen) == len(set(seen)) == 3
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "ordering, values",
+        [
+            (enums.CommentOrdering.NEWEST, ["2024-01-01T00:00:00", "x"]),
+            (enums.CommentOrdering.NEWEST, ["2024-01-01T00:00:00", None]),
+            (enums.CommentOrdering.NEWEST, [1, 1]),
+            (enums.CommentOrdering.TOP, [3, True]),
+            (enums.CommentOrdering.TOP, ["3", 1]),
+        ]
+    )
+    async def test_read_comments_with_wrongly_typed_cursor(
+        self, comment_id: int, session, ordering: enums.CommentOrdering, values: list
+    ):
+        problem_id = await session.scalar(select(models.Comment.problem_id).filter_by(id=comment_id))
+        with pytest.raises(HTTPException) as error:
+            await crud.get_all_comments(
+                problem_id=problem_id,
+                cursor=pagination.encode_cursor(*values),
+                ordering=ordering,
+                db=session
+            )
+        assert error.value.status_code == 400
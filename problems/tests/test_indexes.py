@@ -0,0 +1,136 @@
+import datetime
+
+import pytest
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.dialects import postgresql
+
+import enums
+from auth import models as auth_models
+from problems import crud, models, pagination
+
+
+def explain(stmt) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return f"EXPLAIN {sql}"
+
+
+async def explain_plan(session, stmt, *disabled: str) -> str:
+    try:
+        for setting in disabled:
+            await session.execute(text(f"SET LOCAL {setting} = off"))
+        return "\n".join(row[0] for row in await session.execute(text(explain(stmt))))
+    finally:
+        await session.rollback()
+
+
+class TestIndexes:
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "stmt, indexes",
+        [
+            # the list statements exactly as crud runs them
+            (crud.select_problems(theme_id=1), ("ix_problem_theme_id_id",)),
+            (
+                crud.select_problems(theme_id=1, cursor=pagination.encode_cursor(5)),
+                ("ix_problem_theme_id_id",)
+            ),
+            (
+                crud.select_questions(offset=0, limit=20, theme_id=1, keywords=None),
+                ("ix_question_theme_id_created_at_id",)
+            ),
+            (
+                crud.select_questions(
+                    offset=0,
+                    limit=20,
+                    theme_id=1,
+                    keywords=None,
+                    cursor=pagination.encode_cursor(datetime.datetime(2024, 1, 1), 5),
+                ),
+                ("ix_question_theme_id_created_at_id",)
+            ),
+            (
+                crud.select_comments(problem_id=1),
+                ("ix_comment_problem_id_created_at_id", "ix_comment_response_comment_id")
+            ),
+            (
+                crud.select_comments(
+                    problem_id=1,
+                    cursor=pagination.encode_cursor(datetime.datetime(2024, 1, 1), 5),
+                ),
+                ("ix_comment_problem_id_created_at_id", "ix_comment_response_comment_id")
+            ),
+            (
+                crud.select_comments(problem_id=1, ordering=enums.CommentOrdering.TOP),
+                ("ix_comment_problem_id_likes_id", "ix_comment_response_comment_id")
+            ),
+            (
+                crud.select_comments(
+                    problem_id=1,
+                    cursor=pagination.encode_cursor(3, 5),
+                    ordering=enums.CommentOrdering.TOP,
+                ),
+                ("ix_comment_problem_id_likes_id", "ix_comment_response_comment_id")
+            ),
+            # lookups issued by ORM loaders and ON DELETE actions
+            (
+                select(models.QuestionResponse.id)
+                .where(models.QuestionResponse.question_id == 1),
+                ("ix_question_response_question_id",)
+            ),
+            (
+                select(models.ExplanationImage.id)
+                .where(models.ExplanationImage.problem_id == 1),
+                ("ix_explanation_image_problem_id",)
+            ),
+            (
+                select(models.DoneProblem.problem_id)
+                .where(models.DoneProblem.user_id == 1),
+                ("ix_problem_user_user_id",)
+            ),
+            (delete(models.Comment).where(models.Comment.author_id == 1), ("ix_comment_author_id",)),
+            (
+                update(models.Problem).where(models.Problem.author_id == 1).values(author_id=None),
+                ("ix_problem_author_id",)
+            ),
+            (
+                delete(models.Question).where(models.Question.author_id == 1),
+                ("ix_question_author_id",)
+            ),
+            (
+                delete(models.CommentResponse).where(models.CommentResponse.author_id == 1),
+                ("ix_comment_response_author_id",)
+            ),
+            (
+                delete(models.QuestionResponse).where(models.QuestionResponse.author_id == 1),
+                ("ix_question_response_author_id",)
+            ),
+            (
+                select(auth_models.User.id).where(auth_models.User.username == "test_user"),
+                ("user_username_key",)
+            ),
+        ]
+    )
+    async def test_query_uses_index(self, session, stmt, indexes: tuple[str, ...]):
+        # The test tables are tiny, so sequential scans are switched off to see
+        # which access path the planner has available at all
+        plan = await explain_plan(session, stmt, "enable_seqscan")
+        for index in indexes:
+            assert index in plan, plan
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "stmt, index",
+        [
+            # without trigram indexes the search must stay on the full-text index
+            (crud.select_problems(keywords="numbers umbe"), "ix_problem_description_fts"),
+            (
+                crud.select_questions(offset=0, limit=20, theme_id=None, keywords="numbers umbe"),
+                "ix_question_fts"
+            ),
+        ]
+    )
+    async def test_search_uses_full_text_index(self, session, stmt, index: str):
+        # Matches are re-sorted by rank, so on tiny tables a full walk of any
+        # btree index is as cheap as a sequential scan; GIN is bitmap-only
+        plan = await explain_plan(session, stmt, "enable_seqscan", "enable_indexscan")
+        assert index in plan, plan
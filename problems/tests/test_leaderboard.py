@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+
+from auth.models import User
+from auth.utils import encode_jwt
+from problems import models
+from problems.leaderboard import Ranking, leaderboard
+
+
+@pytest.fixture()
+def fresh_leaderboard():
+    leaderboard.synced_at = None
+    yield leaderboard
+    leaderboard.synced_at = None
+
+
+class TestRanking:
+    def test_rank_and_top(self):
+        ranking = Ranking()
+        ranking.set_score(1, 10)
+        ranking.set_score(2, 30)
+        ranking.set_score(3, 10)
+        ranking.set_score(4, 5)
+
+        assert ranking.get_top(10) == [(1, 2, 30), (2, 1, 10), (2, 3, 10), (4, 4, 5)]
+        assert ranking.get_rank(2) == 1
+        assert ranking.get_rank(3) == 2
+        assert ranking.get_rank(4) == 4
+        assert ranking.get_rank(5) is None
+
+    def test_add_points(self):
+        ranking = Ranking()
+        ranking.add_points(1, 5)
+        ranking.add_points(2, 10)
+        ranking.add_points(1, 20)
+
+        assert ranking.get_top(1) == [(1, 1, 25)]
+        assert ranking.get_rank(2) == 2
+        assert len(ranking) == 2
+
+
+class TestLeaderboard:
+    @pytest.mark.anyio
+    async def test_read_leaderboard(self, client: AsyncClient, fresh_leaderboard):
+        response = await client.get("/users/leaderboard/")
+        assert response.status_code == 200
+        assert response.json().get("me") is None
+
+        fresh_leaderboard.record_solve(user_id=1, theme_id=-1, points=20)
+        token = encode_jwt({"sub": 1})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.get("/users/leaderboard/?theme_id=-1", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["top"] == [{"rank": 1, "id": 1, "username": "test_user", "score": 20}]
+        assert data["me"]["rank"] == 1
+
+    @pytest.mark.anyio
+    @pytest.mark.usefixtures("reset_scores")
+    async def test_refresh_applies_scores_changed_elsewhere(self, session, fresh_leaderboard):
+        await fresh_leaderboard.build(session)
+        await session.rollback()
+
+        # what crud.record_solve does in another worker
+        theme_id = await session.scalar(select(models.Theme.id).limit(1))
+        await session.execute(
+            update(User).filter_by(id=2).values(score=35, score_updated_at=func.now())
+        )
+        session.add(models.ThemeScore(theme_id=theme_id, user_id=2, score=35))
+        await session.commit()
+        assert fresh_leaderboard.overall.get_score(2) is None
+
+        await fresh_leaderboard.refresh(session)
+        await session.rollback()
+        assert fresh_leaderboard.overall.get_score(2) == 35
+        assert fresh_leaderboard.get_ranking(theme_id).get_rank(2) == 1
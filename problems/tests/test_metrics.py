@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from httpx import AsyncClient
+
+import settings
+
+# Stands in for a .env that sets the directory: the import order has to let
+# settings load it before prometheus_client looks, so a fresh interpreter is needed
+MULTIPROCESS_APP = textwrap.dedent("""
+    import asyncio, os, sys
+    import dotenv
+    from httpx import AsyncClient, ASGITransport
+
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    dotenv.load_dotenv = lambda *args, **kwargs: os.environ.update(PROMETHEUS_MULTIPROC_DIR=sys.argv[1])
+    import main
+
+    async def scrape():
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+            await client.get("/no/such/route/")
+            print((await client.get("/metrics")).text)
+
+    asyncio.run(scrape())
+""")
+
+
+class TestMetrics:
+    @pytest.mark.anyio
+    async def test_metrics(self, client: AsyncClient):
+        await client.get("/themes/")
+        await client.get("/no/such/route/")
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/themes/",status="200"}' in body
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+        assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/themes/"}' in body
+        assert "db_pool_checked_out" in body
+        assert "db_pool_checkout_wait_seconds_count" in body
+        assert 'cache_requests_total{result="miss"}' in body
+
+    def test_multiprocess_dir_from_settings(self, tmp_path):
+        output = subprocess.run(
+            [sys.executable, "-c", MULTIPROCESS_APP, str(tmp_path)],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout
+        assert any(tmp_path.iterdir())
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1.0' in output
@@ -1,10 +1,15 @@
+import asyncio
 from json import dumps
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, select, update
 
+import settings
 from auth.utils import encode_jwt
 from enums import DifficultyLevel
-from problems import crud
+from problems import crud, models, pagination
+from problems.models import ThemeScore
 from problems.schemas import ProblemCreate
 
 
@@ -82,6 +87,55 @@ class TestProblem:
         assert response.status_code == 200
         assert len(response.json()) == 1
 
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "keywords, found, substring",
+        [
+            ("numbers", 1, False),
+            ("umbe", 1, True),
+            ("quark gluon", 0, False),
+        ]
+    )
+    async def test_read_problems_keywords(
+        self, client: AsyncClient, session, keywords: str, found: int, substring: bool
+    ):
+        if substring and not await crud.get_trigram_indexes(session):
+            pytest.skip("substring search needs the pg_trgm indexes")
+        response = await client.get("/problems/", params={"keywords": keywords})
+        assert response.status_code == 200
+        assert len(response.json()) == found
+
+    @pytest.mark.anyio
+    async def test_read_problems_cursor(self, client: AsyncClient):
+        response = await client.get("/problems/?limit=1")
+        assert len(response.json()) == 1
+        cursor = response.headers.get("X-Next-Cursor")
+        assert cursor is not None
+
+        response = await client.get(f"/problems/?limit=1&cursor={cursor}")
+        assert response.status_code == 200
+        assert response.json() == []
+        assert "X-Next-Cursor" not in response.headers
+
+        response = await client.get("/problems/?cursor=garbage")
+        assert response.status_code == 400
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "url, values",
+        [
+            ("/problems/", ["x"]),
+            ("/problems/", [None]),
+            ("/problems/", [True]),
+            ("/questions/questions/", ["2024-01-01T00:00:00", "x"]),
+            ("/questions/questions/", [None, 1]),
+            ("/questions/questions/", ["2024-01-01T00:00:00+03:00", 1]),
+        ]
+    )
+    async def test_read_with_wrongly_typed_cursor(self, client: AsyncClient, url: str, values: list):
+        response = await client.get(url, params={"cursor": pagination.encode_cursor(*values)})
+        assert response.status_code == 400
+
     @pytest.mark.anyio
     @pytest.mark.parametrize("problem_id, status_code", [("real", 200), (-3, 404)])
     async def test_read_one_problem(
@@ -95,3 +149,108 @@ class TestProblem:
         assert response.status_code == status_code
         if problem_id == "real":
             assert response.json().get("name") == problems[0].name
+
+    @pytest.mark.anyio
+    async def test_read_one_problem_query_budget(
+        self, client: AsyncClient, session, query_budget, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "DEBUG_QUERY_HEADERS", True)
+        problem_id = (await crud.get_all_problems(db=session))[0].id
+        # a new version of the problem isn't cached yet
+        await session.execute(
+            update(models.Problem).filter_by(id=problem_id).values(updated_at=func.now())
+        )
+        await session.commit()
+
+        # row versions, the problem with its theme and author, its images
+        with query_budget(3):
+            response = await client.get(f"/problems/{problem_id}/")
+        assert response.headers["X-DB-Queries"] == "3"
+        assert float(response.headers["X-DB-Time-ms"]) > 0
+
+        with query_budget(1):
+            await client.get(f"/problems/{problem_id}/")
+
+    @pytest.mark.anyio
+    async def test_read_one_problem_etag(self, client: AsyncClient, session):
+        problem_id = (await crud.get_all_problems(db=session))[0].id
+        response = await client.get(f"/problems/{problem_id}/")
+        etag = response.headers["ETag"]
+
+        for if_none_match in (etag, f'"other", W/{etag}', "*"):
+            response = await client.get(
+                f"/problems/{problem_id}/", headers={"If-None-Match": if_none_match}
+            )
+            assert response.status_code == 304
+
+        headers = {"Authorization": f"Bearer {encode_jwt({'sub': 2})}"}
+        await client.post(f"/problems/{problem_id}/comments/?body=Nice", headers=headers)
+        response = await client.get(f"/problems/{problem_id}/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @pytest.mark.anyio
+    @pytest.mark.usefixtures("reset_scores")
+    async def test_submit_problem_solution(self, client: AsyncClient, session):
+        problems = await crud.get_all_problems(db=session)
+        problem_id = problems[0].id
+        token = encode_jwt({"sub": 1})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.get(f"/problems/{problem_id}/explanation/", headers=headers)
+        assert response.status_code == 403
+
+        response = await client.post(
+            f"/problems/{problem_id}/submit/?answer=wrong", headers=headers
+        )
+        assert response.json().get("success") is False
+
+        for _ in range(2):
+            response = await client.post(
+                f"/problems/{problem_id}/submit/?answer=10.2", headers=headers
+            )
+            assert response.json().get("success") is True
+
+        response = await client.get(f"/problems/{problem_id}/")
+        assert response.json().get("completions") == 1
+        response = await client.get("/users/profile/me/", headers=headers)
+        assert response.json().get("score") == 5
+        theme_score = await session.scalar(
+            select(ThemeScore.score).filter_by(user_id=1, theme_id=problems[0].theme.id)
+        )
+        assert theme_score == 5
+        response = await client.get(f"/problems/{problem_id}/explanation/", headers=headers)
+        assert response.status_code == 200
+
+    @pytest.mark.anyio
+    @pytest.mark.usefixtures("reset_scores")
+    async def test_submit_problem_solution_concurrently(self, client: AsyncClient, session):
+        problems = await crud.get_all_problems(db=session)
+        problem_id = problems[0].id
+        token = encode_jwt({"sub": 2})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        responses = await asyncio.gather(*(
+            client.post(f"/problems/{problem_id}/submit/?answer=10.2", headers=headers)
+            for _ in range(5)
+        ))
+        assert all(response.json().get("success") for response in responses)
+
+        response = await client.get("/users/profile/me/", headers=headers)
+        assert response.json().get("score") == 5
+        response = await client.get(f"/problems/{problem_id}/")
+        assert response.json().get("completions") == 2
+
+    @pytest.mark.anyio
+    async def test_create_explanation_images(self, client: AsyncClient, session):
+        problems = await crud.get_all_problems(db=session)
+        problem_id = problems[0].id
+        urls = ["https://example.com/one.png", "https://example.com/two.png"]
+        image_ids = await crud.create_explanation_images(
+            problem_id=problem_id, image_urls=urls, db=session
+        )
+        assert len(image_ids) == 2
+
+        problem = await crud.get_problem_by_id(db=session, problem_id=problem_id)
+        await session.refresh(problem, ["images"])
+        assert sorted(image.image_url for image in problem.images) == urls
@@ -1,7 +1,8 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import func, update
 
-from problems import crud
+from problems import crud, models
 from auth.utils import encode_jwt
 from problems.schemas import ThemeBase
 
@@ -12,6 +13,15 @@ class TestTheme:
         response = await client.get("/themes/")
         assert response.status_code == 200
 
+    @pytest.mark.anyio
+    async def test_read_themes_counts(self, client: AsyncClient):
+        themes = (await client.get("/themes/")).json()
+        problems = (await client.get("/problems/")).json()
+        assert sum(theme["problems_num"] for theme in themes) == len(problems)
+        for theme in themes:
+            theme_problems = (await client.get(f"/problems/?theme_id={theme['id']}")).json()
+            assert theme["problems_num"] == len(theme_problems)
+
     @pytest.mark.anyio
     @pytest.mark.parametrize(
         "user_id, status_code",
@@ -56,6 +66,47 @@ class TestTheme:
         assert response.status_code == 200
         assert response.json().get("name") == "Nuclear fusion"
 
+    @pytest.mark.anyio
+    async def test_read_one_theme_etag(self, client: AsyncClient, session):
+        headers = {"Authorization": f"Bearer {encode_jwt({'sub': 2})}"}
+        theme = (await crud.get_all_themes(db=session))[0]
+        response = await client.get(f"/themes/{theme.id}/")
+        etag = response.headers["ETag"]
+        assert "max-age" in response.headers["Cache-Control"]
+
+        response = await client.get(f"/themes/{theme.id}/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+        theme_json = {"name": theme.name, "description": "Changed description"}
+        await client.put(f"/themes/{theme.id}/", headers=headers, json=theme_json)
+        response = await client.get(f"/themes/{theme.id}/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json().get("description") == "Changed description"
+
+    @pytest.mark.anyio
+    async def test_etag_and_body_agree_when_another_worker_wrote(
+        self, client: AsyncClient, session
+    ):
+        theme = (await crud.get_all_themes(db=session))[0]
+        etag = (await client.get(f"/themes/{theme.id}/")).headers["ETag"]
+
+        # a write handled by another worker, which invalidates only its own cache
+        await session.execute(
+            update(models.Theme)
+            .filter_by(id=theme.id)
+            .values(description="Written elsewhere", updated_at=func.now())
+        )
+        await session.commit()
+
+        response = await client.get(f"/themes/{theme.id}/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json().get("description") == "Written elsewhere"
+        response = await client.get("/themes/")
+        assert "Written elsewhere" in [theme["description"] for theme in response.json()]
+
     @pytest.mark.anyio
     @pytest.mark.parametrize(
         "user_id, status_code",
@@ -0,0 +1,113 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import settings
+
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time-ms"
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.time_sec = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.time_sec += seconds
+        self.statements[statement] += 1
+
+    @property
+    def time_ms(self) -> float:
+        return self.time_sec * 1000
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements issued at least `threshold` times, the usual sign of an N+1."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+# SQLAlchemy runs the driver in a greenlet that shares the caller's context,
+# so collectors pushed in a request (or a test) see that request's statements
+active_stats: ContextVar[tuple[QueryStats, ...]] = ContextVar("active_stats", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = active_stats.set(active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        active_stats.reset(token)
+
+
+def instrument(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        for stats in active_stats.get():
+            stats.record(statement, seconds)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and settings.DEBUG_QUERY_HEADERS:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERIES_HEADER.encode(), str(stats.count).encode()))
+                    headers.append((TIME_HEADER.encode(), f"{stats.time_ms:.1f}".encode()))
+                    message["headers"] = headers
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                log_request(scope, stats)
+
+
+def log_request(scope, stats: QueryStats) -> None:
+    route = scope.get("route")
+    fields = {
+        "method": scope["method"],
+        "route": route.path if route is not None else scope["path"],
+        "db_queries": stats.count,
+        "db_time_ms": round(stats.time_ms, 1),
+    }
+    logger.debug(
+        "%(method)s %(route)s db_queries=%(db_queries)d db_time_ms=%(db_time_ms).1f",
+        fields,
+        extra=fields,
+    )
+    for statement, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(
+            "possible N+1 in %s %s: statement issued %d times: %s",
+            fields["method"], fields["route"], count, statement,
+            extra={**fields, "statement": statement, "statement_count": count},
+        )
@@ -0,0 +1,21 @@
+from typing import Any
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+class SchemaResponse(ORJSONResponse):
+    """
+    Serializes pydantic models that are already validated straight to JSON.
+    FastAPI passes a returned Response through as is, so the handler's
+    response_model is then only used for the docs, not validated a second time.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+def schema_response(content: Any, response: Response) -> Response:
+    """Wraps validated content, keeping the headers set on the injected `response`."""
+    return SchemaResponse(content, headers=dict(response.headers))
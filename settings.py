@@ -7,14 +7,49 @@ load_dotenv()
 BASE_DIR = Path(__file__).parent
 
 POSTGRES_DATABASE_URL = os.getenv("POSTGRES_DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT_SEC = float(os.getenv("DB_POOL_TIMEOUT_SEC", 30))
+DB_POOL_RECYCLE_SEC = int(os.getenv("DB_POOL_RECYCLE_SEC", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_POOL_WARMUP_CONNECTIONS = int(os.getenv("DB_POOL_WARMUP_CONNECTIONS", DB_POOL_SIZE))
 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_CUSTOM_DOMAIN = "https://physics-s3.s3.eu-north-1.amazonaws.com/"
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", 4))
 
 PRIVATE_KEY_PATH: Path = BASE_DIR / "auth" / "certs" / "jwt-private.pem"
 PUBLIC_KEY_PATH: Path = BASE_DIR / "auth" / "certs" / "jwt-public.pem"
 ACCESS_TOKEN_LIFETIME_SEC = 7 * 86400
+# RS256, ES256 or EdDSA, the key files above have to be of the matching type
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "RS256")
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", 4096))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", 4))
+
+# "memory" is per process and only invalidated in the worker that handled the write,
+# so with several workers (uvicorn reads WEB_CONCURRENCY) caching is off unless it's "redis"
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "memory" if int(os.getenv("WEB_CONCURRENCY", 1)) == 1 else "none"
+)
+CACHE_TTL_SEC = int(os.getenv("CACHE_TTL_SEC", 300))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+CATALOGUE_MAX_AGE_SEC = int(os.getenv("CATALOGUE_MAX_AGE_SEC", 60))
+CATALOGUE_STALE_WHILE_REVALIDATE_SEC = int(os.getenv("CATALOGUE_STALE_WHILE_REVALIDATE_SEC", 300))
+
+LEADERBOARD_REFRESH_SEC = int(os.getenv("LEADERBOARD_REFRESH_SEC", 10))
+
+DEBUG_QUERY_HEADERS = os.getenv("DEBUG_QUERY_HEADERS", "false").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+# prometheus_client reads this itself when it is imported, so metrics imports this module
+# (and with it .env) first. Every worker must get the same directory.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
 
 MODE = os.getenv("MODE")